@@ -1,4 +1,4 @@
-from gemini_service import ask_gemini, GeminiService, gemini_service
+from gemini_service import ask_gemini, gemini_service
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, 
                              QLabel, QComboBox, QPushButton, QFrame, QLineEdit, QDialog, QGraphicsDropShadowEffect,
                              QSpinBox, QTextEdit, QCheckBox, QScrollArea, QProgressBar, QGraphicsBlurEffect,
@@ -410,10 +410,11 @@ class SimplePlugin(PluginBase):
 
 #main:
 if __name__ == "__main__":
+    # One shared service, so every turn reuses its HTTP connection pool
+    ai = gemini_service
+    plugin = SimplePlugin()
     while True:
         user_input = input("You: ")
-        ai = GeminiService()
-        plugin = SimplePlugin()
         if ai.is_available():
             response, commands = chat(ai, user_input, plugin)
             print(f"AI Response: {response}")
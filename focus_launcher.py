@@ -5,12 +5,13 @@ import os
 import subprocess
 import time
 import signal
+import socket
 import atexit
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, 
                              QLabel, QComboBox, QPushButton, QFrame, QLineEdit, QDialog, QGraphicsDropShadowEffect,
                              QSpinBox, QTextEdit, QCheckBox, QScrollArea, QProgressBar, QGraphicsBlurEffect,
                              QSystemTrayIcon, QMenu, QAction)
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QPropertyAnimation, QEasingCurve, QThread
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QPropertyAnimation, QEasingCurve, QThread, QSocketNotifier
 from PyQt5.QtGui import QFont, QPalette, QColor, QPainter, QPen, QBrush, QPixmap, QRadialGradient, QIcon
 import math
 import json
@@ -18,6 +19,11 @@ import time as time_module
 from datetime import datetime, timedelta
 from typing import List
 
+# Datagram socket an active session listens on; external controllers (the
+# control surface sniffers) send b'stop' to it, or connect to it to check
+# whether a session is running
+SESSION_SOCKET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'session.sock')
+
 def get_app_icon():
     """Get the application icon for dock/window display"""
     try:
@@ -932,7 +938,8 @@ class PluginTaskDialog(QDialog):
     def scan_for_tasks(self):
         """Use plugin hooks to scan for additional tasks"""
         try:
-            from plugin_system import plugin_manager
+            from plugin_system import get_plugin_manager
+            plugin_manager = get_plugin_manager()
             
             # Call plugin hooks to get additional tasks - plugins return suggested tasks
             additional_tasks = plugin_manager.call_goals_analyzed_hooks(self.current_goals, "")
@@ -1193,6 +1200,8 @@ class ProgressPopup(QWidget):
         print(f"DEBUG: ProgressPopup initialized with interval: {popup_interval} minutes")
         self.start_time = datetime.now()
         self.completed_goals = set()
+        # Bumped whenever goals/completed_goals change so plugins can cache checklist reads
+        self._checklist_version = 0
         self.app_usage = {}
         self.current_app = ""
         self.website_usage = {}
@@ -1550,6 +1559,7 @@ class ProgressPopup(QWidget):
         
         # Add to goals list
         self.goals.append(formatted_task)
+        self._checklist_version += 1
         
         try:
             from PyQt5.QtWidgets import QCheckBox
@@ -1618,9 +1628,12 @@ class ProgressPopup(QWidget):
         self.app_timer.timeout.connect(self.track_website_usage)
         self.app_timer.start(5000)  # Every 5 seconds
         
+        self.open_control_socket()
+        
         # Call session start hooks
         try:
-            from plugin_system import plugin_manager
+            from plugin_system import get_plugin_manager
+            plugin_manager = get_plugin_manager()
             session_data = {
                 'duration': self.session_duration,
                 'goals': self.goals,
@@ -1846,8 +1859,51 @@ class ProgressPopup(QWidget):
         
         return self._current_message
     
+    def open_control_socket(self):
+        """Bind the session control socket and wake on incoming datagrams"""
+        self.control_socket = None
+        try:
+            if os.path.exists(SESSION_SOCKET_PATH):
+                os.remove(SESSION_SOCKET_PATH)  # Left behind by a session that didn't exit cleanly
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(SESSION_SOCKET_PATH)
+            sock.setblocking(False)
+        except OSError as e:
+            print(f"Session control socket unavailable: {e}")
+            return
+        self.control_socket = sock
+        self.control_notifier = QSocketNotifier(sock.fileno(), QSocketNotifier.Read, self)
+        self.control_notifier.activated.connect(self.handle_control_message)
+    
+    def handle_control_message(self):
+        """Drain the control socket and end the session on b'stop'"""
+        stop_requested = False
+        while True:
+            try:
+                message = self.control_socket.recv(64)
+            except (BlockingIOError, OSError):
+                break
+            if message.strip() == b'stop':
+                stop_requested = True
+        if stop_requested:
+            print("DEBUG: Stop message received - ending session")
+            self.stop_focus_mode()
+    
+    def close_control_socket(self):
+        """Stop listening so controllers see the session as ended"""
+        sock = getattr(self, 'control_socket', None)
+        if sock is None:
+            return
+        self.control_notifier.setEnabled(False)
+        sock.close()
+        self.control_socket = None
+        try:
+            os.remove(SESSION_SOCKET_PATH)
+        except OSError:
+            pass
+    
     def update_progress(self):
-        # Check for stop signal file
+        # Check for stop signal file (still honoured for scripts that write it)
         script_dir = os.path.dirname(os.path.abspath(__file__))
         stop_signal_file = os.path.join(script_dir, 'stop_signal')
         if os.path.exists(stop_signal_file):
@@ -1890,7 +1946,8 @@ class ProgressPopup(QWidget):
         
         # Call session update hooks
         try:
-            from plugin_system import plugin_manager
+            from plugin_system import get_plugin_manager
+            plugin_manager = get_plugin_manager()
             plugin_manager.call_session_update_hooks(elapsed, progress)
         except Exception as e:
             print(f"Plugin session update hook error: {e}")
@@ -2088,10 +2145,12 @@ class ProgressPopup(QWidget):
             self.completed_goals.add(goal_text)
         else:
             self.completed_goals.discard(goal_text)
+        self._checklist_version += 1
         
         # Call plugin hooks for checklist item changes
         try:
-            from plugin_system import plugin_manager
+            from plugin_system import get_plugin_manager
+            plugin_manager = get_plugin_manager()
             print(f"DEBUG: Calling checklist item changed hooks for: {goal_text}, checked: {state == 2}")
             plugin_manager.call_checklist_item_changed_hooks(goal_text, state == 2)
         except Exception as e:
@@ -2112,6 +2171,8 @@ class ProgressPopup(QWidget):
                 os.remove(current_mode_file)
                 print("DEBUG: current_mode file deleted (session complete)")
             
+            self.close_control_socket()
+            
             # Also clean up any leftover stop_signal file
             stop_signal_file = os.path.join(script_dir, 'stop_signal')
             if os.path.exists(stop_signal_file):
@@ -2125,7 +2186,8 @@ class ProgressPopup(QWidget):
         
         # Call session end hooks
         try:
-            from plugin_system import plugin_manager
+            from plugin_system import get_plugin_manager
+            plugin_manager = get_plugin_manager()
             session_data = {
                 'duration': actual_duration,
                 'planned_duration': self.session_duration,
@@ -2174,6 +2236,8 @@ class ProgressPopup(QWidget):
                 os.remove(current_mode_file)
                 print("DEBUG: current_mode file deleted (early termination)")
             
+            self.close_control_socket()
+            
             # Also clean up any leftover stop_signal file
             stop_signal_file = os.path.join(script_dir, 'stop_signal')
             if os.path.exists(stop_signal_file):
@@ -2187,7 +2251,8 @@ class ProgressPopup(QWidget):
         
         # Call session end hooks for early termination
         try:
-            from plugin_system import plugin_manager
+            from plugin_system import get_plugin_manager
+            plugin_manager = get_plugin_manager()
             session_data = {
                 'duration': actual_duration,
                 'planned_duration': self.session_duration,
@@ -2264,7 +2329,8 @@ class SessionSummary(QWidget):
         
         # Close any other plugin dialogs that might be open
         try:
-            from plugin_system import plugin_manager
+            from plugin_system import get_plugin_manager
+            plugin_manager = get_plugin_manager()
             for plugin in plugin_manager.loaded_plugins.values():
                 if hasattr(plugin, '_active_dialogs'):
                     for dialog in plugin._active_dialogs[:]:
@@ -2709,7 +2775,8 @@ class SessionSummary(QWidget):
         # Call summary closed hooks before cleanup
         print("DEBUG: close_with_cleanup called")
         try:
-            from plugin_system import plugin_manager
+            from plugin_system import get_plugin_manager
+            plugin_manager = get_plugin_manager()
             print(f"DEBUG: Plugin manager has {len(plugin_manager.loaded_plugins)} loaded plugins")
             print(f"DEBUG: Loaded plugins: {list(plugin_manager.loaded_plugins.keys())}")
             print("DEBUG: Calling summary closed hooks")
@@ -2935,6 +3002,46 @@ class PasswordDialog(QDialog):
         if self.password:
             self.accept()
 
+class SavingPasswordDialog(PasswordDialog):
+    """PasswordDialog with a "Remember password" option, used by password_manager"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.save_password = False
+        
+        layout = self.layout()
+        
+        # Add save password checkbox before buttons
+        self.save_checkbox = QCheckBox("Remember password securely")
+        self.save_checkbox.setChecked(True)  # Default to saving
+        self.save_checkbox.setStyleSheet("""
+            QCheckBox {
+                font-size: 14px;
+                color: #1d1d1f;
+                margin: 10px 0;
+            }
+            QCheckBox::indicator {
+                width: 18px;
+                height: 18px;
+            }
+            QCheckBox::indicator:unchecked {
+                border: 2px solid #d1d1d6;
+                border-radius: 3px;
+                background-color: white;
+            }
+            QCheckBox::indicator:checked {
+                border: 2px solid #007aff;
+                border-radius: 3px;
+                background-color: #007aff;
+            }
+        """)
+        
+        # Insert before the last item (the button layout)
+        layout.insertWidget(layout.count() - 1, self.save_checkbox)
+    
+    def accept(self):
+        self.save_password = self.save_checkbox.isChecked()
+        super().accept()
+
 class BreathingCircle(QWidget):
     def __init__(self):
         super().__init__()
@@ -3421,8 +3528,10 @@ class FocusSelector(QWidget):
     def show_plugin_settings(self):
         """Show the plugin settings window"""
         try:
-            from plugin_settings_dialog import PluginSettingsDialog
-            self.settings_window = PluginSettingsDialog(self)
+            # Reuse the window between opens so its plugin cards are built only once
+            if getattr(self, 'settings_window', None) is None:
+                from plugin_settings_dialog import PluginSettingsDialog
+                self.settings_window = PluginSettingsDialog(self)
             self.settings_window.show()
             self.settings_window.raise_()
             self.settings_window.activateWindow()
@@ -3543,7 +3652,8 @@ class FocusLauncher:
             """Cleanup function called on exit"""
             print("Performing emergency cleanup...")
             try:
-                from plugin_system import plugin_manager
+                from plugin_system import get_plugin_manager
+                plugin_manager = get_plugin_manager()
                 plugin_manager.cleanup_all_plugins()
             except Exception as e:
                 print(f"Plugin cleanup error: {e}")
@@ -3566,8 +3676,9 @@ class FocusLauncher:
         
         # Initialize plugin system
         try:
-            from plugin_system import plugin_manager
-            # Plugin manager is initialized when imported and will load previously enabled plugins
+            from plugin_system import get_plugin_manager
+            # Builds the plugin manager; previously enabled plugins load on first use
+            get_plugin_manager()
         except Exception as e:
             print(f"Plugin system initialization error: {e}")
         
@@ -3707,7 +3818,8 @@ class FocusLauncher:
         
         # Set progress popup reference for plugin system
         try:
-            from plugin_system import plugin_manager
+            from plugin_system import get_plugin_manager
+            plugin_manager = get_plugin_manager()
             plugin_manager.set_progress_popup_reference(self.progress_popup)
         except Exception as e:
             print(f"Error setting progress popup reference: {e}")
@@ -100,7 +100,8 @@ Examples:
         """Cleanup function called on exit"""
         print("Performing emergency cleanup...")
         try:
-            from plugin_system import plugin_manager
+            from plugin_system import get_plugin_manager
+            plugin_manager = get_plugin_manager()
             plugin_manager.cleanup_all_plugins()
         except Exception as e:
             print(f"Plugin cleanup error: {e}")
@@ -123,7 +124,8 @@ Examples:
     
     try:
         # Initialize plugin system
-        from plugin_system import plugin_manager
+        from plugin_system import get_plugin_manager
+        plugin_manager = get_plugin_manager()
         plugin_manager.discover_plugins()
         plugin_manager.load_enabled_plugins()
     except Exception as e:
@@ -283,7 +285,8 @@ def run_cli_session(app, args):
     
     # Set progress popup reference for plugin system
     try:
-        from plugin_system import plugin_manager
+        from plugin_system import get_plugin_manager
+        plugin_manager = get_plugin_manager()
         plugin_manager.set_progress_popup_reference(progress_popup)
     except Exception as e:
         print(f"Error setting progress popup reference: {e}")
@@ -6,16 +6,67 @@ Handles AI-powered chat with better instruction following
 """
 
 import os
-import json
-import requests
+import httpx
 import time
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator
+
+# Prefer orjson for payload/response (de)serialization; fall back to stdlib json
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+    _json_loads = json.loads
+
+# System apps excluded from get_installed_applications()
+SYSTEM_APPS = frozenset({
+    'Activity Monitor', 'AirPort Utility', 'Automator', 'Bluetooth Screen Sharing',
+    'Boot Camp Assistant', 'Calculator', 'Calendar', 'Chess', 'ColorSync Utility',
+    'Console', 'Contacts', 'Digital Color Meter', 'Directory Utility', 'Disk Utility',
+    'DVD Player', 'FaceTime', 'Font Book', 'Grapher', 'Image Capture', 'Keychain Access',
+    'Launchpad', 'Mail', 'Maps', 'Messages', 'Migration Assistant', 'Notes', 'Photo Booth',
+    'Photos', 'Preview', 'QuickTime Player', 'Reminders', 'Safari', 'Screenshot Path',
+    'Stickies', 'System Information', 'System Preferences', 'Terminal', 'TextEdit',
+    'Time Machine', 'VoiceOver Utility', 'Archive Utility', 'Finder', 'System Events',
+    'WindowServer', 'Dock', 'SystemUIServer', 'loginwindow', 'Uninstall Resolve',
+    'Adobe Activation Tool'
+})
 
 class GeminiService:
     def __init__(self):
         self.api_key = None
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent"
+        self.base_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:streamGenerateContent?alt=sse"
+        # One pooled client so calls share a multiplexed HTTP/2 connection;
+        # the transport retries failed connects, 503s are retried in ask_stream()
+        limits = httpx.Limits(max_keepalive_connections=10, max_connections=20)
+        try:
+            self.client = httpx.Client(
+                http2=True,
+                transport=httpx.HTTPTransport(http2=True, retries=3, limits=limits),
+                timeout=30.0,
+            )
+        except ImportError:
+            # httpx raises this when the h2 package (httpx[http2]) is missing
+            print("HTTP/2 support not installed (pip install 'httpx[http2]'); using HTTP/1.1 keep-alive")
+            self.client = httpx.Client(
+                transport=httpx.HTTPTransport(retries=3, limits=limits),
+                timeout=30.0,
+            )
+        # Sampling settings shared by every request; only maxOutputTokens varies
+        self._gen_config = {
+            "temperature": 0.7,
+            "topK": 40,
+            "topP": 0.95,
+        }
         self._load_api_key()
+        # Send the key as a header so the URL stays constant and HPACK can compress it
+        self._headers = {
+            "Content-Type": "application/json",
+            "x-goog-api-key": self.api_key or "",
+        }
     
     def _load_api_key(self):
         """Load Gemini API key from file"""
@@ -53,9 +104,24 @@ class GeminiService:
         Returns:
             The AI's response as a string, or empty string if error
         """
+        return "".join(self.ask_stream(prompt, system_prompt, conversation_history, max_tokens)).strip()
+    
+    def ask_stream(self, prompt: str, system_prompt: str = None, conversation_history: list = None, max_tokens: int = 1024) -> Iterator[str]:
+        """
+        Streaming variant of ask() using Gemini's server-sent events endpoint.
+        
+        Args:
+            prompt: The prompt to send to the AI
+            system_prompt: Optional system prompt to set AI behavior
+            conversation_history: Optional list of previous messages for context
+            max_tokens: Maximum tokens in response (default: 1024)
+            
+        Yields:
+            Text deltas as they arrive; yields nothing if error
+        """
         if not self.is_available():
             print("Gemini service not available")
-            return ""
+            return
         
         try:
             # Build the conversation
@@ -90,60 +156,57 @@ class GeminiService:
             # Prepare request
             payload = {
                 "contents": contents,
-                "generationConfig": {
-                    "maxOutputTokens": max_tokens,
-                    "temperature": 0.7,
-                    "topK": 40,
-                    "topP": 0.95,
-                }
+                "generationConfig": {**self._gen_config, "maxOutputTokens": max_tokens}
             }
             
-            headers = {
-                "Content-Type": "application/json"
-            }
+            body = _json_dumps(payload)
             
             # Make API request with retry logic for 503 errors
-            url = f"{self.base_url}?key={self.api_key}"
-            
+            received_any = False
             for attempt in range(3):  # Try up to 3 times
                 try:
-                    response = requests.post(url, headers=headers, json=payload, timeout=30)
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        if 'candidates' in data and len(data['candidates']) > 0:
-                            candidate = data['candidates'][0]
-                            if 'content' in candidate and 'parts' in candidate['content']:
-                                return candidate['content']['parts'][0]['text'].strip()
-                            else:
-                                print("Unexpected Gemini response format")
-                                return ""
+                    with self.client.stream("POST", self.base_url, headers=self._headers, content=body) as response:
+                        if response.status_code == 200:
+                            for line in response.iter_lines():
+                                # SSE frames look like "data: {...}"; skip keep-alives and blank separators
+                                if not line or not line.startswith("data:"):
+                                    continue
+                                data = _json_loads(line[5:])
+                                candidates = data.get('candidates')
+                                if not candidates:
+                                    continue
+                                for part in candidates[0].get('content', {}).get('parts', []):
+                                    text = part.get('text')
+                                    if text:
+                                        received_any = True
+                                        yield text
+                            if not received_any:
+                                print("No candidates in Gemini response")
+                            return
+                        elif response.status_code == 503:
+                            # Model overloaded - wait and retry
+                            wait_time = (attempt + 1) * 2  # 2, 4, 6 seconds
+                            print(f"Gemini overloaded, retrying in {wait_time}s... (attempt {attempt + 1}/3)")
+                            time.sleep(wait_time)
+                            continue
                         else:
-                            print("No candidates in Gemini response")
-                            return ""
-                    elif response.status_code == 503:
-                        # Model overloaded - wait and retry
-                        wait_time = (attempt + 1) * 2  # 2, 4, 6 seconds
-                        print(f"Gemini overloaded, retrying in {wait_time}s... (attempt {attempt + 1}/3)")
-                        time.sleep(wait_time)
-                        continue
-                    else:
-                        print(f"Gemini API error: {response.status_code} - {response.text}")
-                        return ""
+                            response.read()
+                            print(f"Gemini API error: {response.status_code} - {response.text}")
+                            return
                         
-                except requests.exceptions.Timeout:
+                except httpx.TimeoutException:
                     print(f"Gemini request timeout (attempt {attempt + 1}/3)")
+                    if received_any:  # Retrying would repeat text already yielded
+                        return
                     if attempt < 2:  # Don't sleep on last attempt
                         time.sleep(2)
                     continue
             
             # If we get here, all retries failed
             print("Gemini service unavailable after 3 attempts. You may want to try again later.")
-            return ""
                 
         except Exception as e:
             print(f"Error calling Gemini service: {e}")
-            return ""
     
     def get_installed_applications(self) -> List[str]:
         """Get list of all installed applications on macOS"""
@@ -177,23 +240,8 @@ class GeminiService:
         if os.path.exists(home_apps):
             scan_directory(home_apps)
         
-        # Filter out system apps and duplicates
-        system_apps = {
-            'Activity Monitor', 'AirPort Utility', 'Automator', 'Bluetooth Screen Sharing',
-            'Boot Camp Assistant', 'Calculator', 'Calendar', 'Chess', 'ColorSync Utility',
-            'Console', 'Contacts', 'Digital Color Meter', 'Directory Utility', 'Disk Utility',
-            'DVD Player', 'FaceTime', 'Font Book', 'Grapher', 'Image Capture', 'Keychain Access',
-            'Launchpad', 'Mail', 'Maps', 'Messages', 'Migration Assistant', 'Notes', 'Photo Booth',
-            'Photos', 'Preview', 'QuickTime Player', 'Reminders', 'Safari', 'Screenshot Path',
-            'Stickies', 'System Information', 'System Preferences', 'Terminal', 'TextEdit',
-            'Time Machine', 'VoiceOver Utility', 'Archive Utility', 'Finder', 'System Events',
-            'WindowServer', 'Dock', 'SystemUIServer', 'loginwindow', 'Uninstall Resolve',
-            'Adobe Activation Tool'
-        }
-        
-        # Remove system apps and return unique apps
-        user_apps = [app for app in set(apps) if app not in system_apps]
-        return sorted(user_apps)
+        # Remove system apps and duplicates
+        return sorted(set(apps) - SYSTEM_APPS)
 
 
 # Convenience function for easy importing
@@ -214,8 +262,8 @@ def ask_gemini(prompt: str, system_prompt: str = None, conversation_history: lis
         from gemini_service import ask_gemini
         response = ask_gemini("What's the weather like?", system_prompt="Be concise")
     """
-    service = GeminiService()
-    return service.ask(prompt, system_prompt, conversation_history, max_tokens)
+    # Reuse the global instance so calls share its pooled connection
+    return gemini_service.ask(prompt, system_prompt, conversation_history, max_tokens)
 
 # Global instance
 gemini_service = GeminiService()
\ No newline at end of file
@@ -5,14 +5,28 @@ Handles encrypted storage and retrieval of sudo passwords.
 """
 
 import os
-import json
 import hashlib
 import base64
+import time
 from typing import Optional
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
+# Prefer orjson for the auth file; fall back to stdlib json
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+    _json_loads = json.loads
+
+# How long a successful sudo check of the stored password is trusted (seconds)
+VERIFY_TTL_SECONDS = 600
+
 class SecurePasswordManager:
     """
     Manages encrypted storage of sudo password with machine-specific encryption.
@@ -22,6 +36,10 @@ class SecurePasswordManager:
         self.app_dir = app_dir or os.path.dirname(os.path.abspath(__file__))
         self.password_file = os.path.join(self.app_dir, '.focus_auth.enc')
         self.machine_key = self._get_machine_key()
+        # Memoized get_password() result (including "no password"), so repeated
+        # checks on one instance don't re-read and re-decrypt the file
+        self._cached_password: Optional[str] = None
+        self._cached = False
         
     def _get_machine_key(self) -> bytes:
         """
@@ -72,15 +90,13 @@ class SecurePasswordManager:
             data = {
                 'encrypted_password': base64.urlsafe_b64encode(encrypted_password).decode(),
                 'version': 1,
-                'app': 'focus_mode'
+                'app': 'focus_mode',
+                # Callers only save passwords that just passed verify_password()
+                'verified_at': time.time()
             }
             
-            # Save to file with restricted permissions
-            with open(self.password_file, 'w') as f:
-                json.dump(data, f)
-            
-            # Set restrictive file permissions (600 - owner read/write only)
-            os.chmod(self.password_file, 0o600)
+            self._write_data(data)
+            self._invalidate_cache()
             
             print("Password saved securely")
             return True
@@ -96,16 +112,20 @@ class SecurePasswordManager:
         Returns:
             The decrypted password if available, None otherwise
         """
+        if self._cached:
+            return self._cached_password
+        
+        self._cached_password = self._decrypt_password()
+        self._cached = True
+        return self._cached_password
+    
+    def _decrypt_password(self) -> Optional[str]:
+        """Read the auth file and decrypt the stored password"""
         try:
-            if not os.path.exists(self.password_file):
-                return None
-            
-            # Read encrypted data
-            with open(self.password_file, 'r') as f:
-                data = json.load(f)
+            data = self._read_data()
             
             # Verify format
-            if 'encrypted_password' not in data:
+            if not data or 'encrypted_password' not in data:
                 return None
             
             # Decrypt password
@@ -119,6 +139,60 @@ class SecurePasswordManager:
             print(f"Error retrieving password: {e}")
             return None
     
+    def _invalidate_cache(self):
+        """Forget the memoized get_password() result"""
+        self._cached_password = None
+        self._cached = False
+    
+    def _read_data(self) -> Optional[dict]:
+        """Load the raw auth file contents, or None if no file exists"""
+        if not os.path.exists(self.password_file):
+            return None
+        with open(self.password_file, 'rb') as f:
+            return _json_loads(f.read())
+    
+    def _write_data(self, data: dict):
+        """Write the auth file with restricted permissions"""
+        with open(self.password_file, 'wb') as f:
+            f.write(_json_dumps(data))
+        
+        # Set restrictive file permissions (600 - owner read/write only)
+        os.chmod(self.password_file, 0o600)
+    
+    def is_recently_verified(self, max_age: float = VERIFY_TTL_SECONDS) -> bool:
+        """
+        Check if the stored password passed a sudo check within max_age seconds.
+        
+        Returns:
+            True if the last verification is recent enough to skip another one
+        """
+        try:
+            data = self._read_data()
+            if not data:
+                return False
+            age = time.time() - float(data.get('verified_at', 0))
+            return 0 <= age < max_age
+        except Exception:
+            return False
+    
+    def mark_verified(self) -> bool:
+        """
+        Record that the stored password just passed a sudo check.
+        
+        Returns:
+            True if the timestamp was updated, False otherwise
+        """
+        try:
+            data = self._read_data()
+            if not data:
+                return False
+            data['verified_at'] = time.time()
+            self._write_data(data)
+            return True
+        except Exception as e:
+            print(f"Error updating password verification time: {e}")
+            return False
+    
     def has_saved_password(self) -> bool:
         """
         Check if a password is saved.
@@ -135,6 +209,7 @@ class SecurePasswordManager:
         Returns:
             True if cleared successfully, False otherwise
         """
+        self._invalidate_cache()
         try:
             if os.path.exists(self.password_file):
                 os.remove(self.password_file)
@@ -184,8 +259,13 @@ def get_sudo_password(force_new: bool = False) -> Optional[str]:
     if not force_new and password_manager.has_saved_password():
         stored_password = password_manager.get_password()
         if stored_password:
+            # Skip the sudo round-trip if the password was checked recently
+            if password_manager.is_recently_verified():
+                print("Using stored password")
+                return stored_password
             # Verify the stored password still works
             if password_manager.verify_password(stored_password):
+                password_manager.mark_verified()
                 print("Using stored password")
                 return stored_password
             else:
@@ -194,8 +274,9 @@ def get_sudo_password(force_new: bool = False) -> Optional[str]:
     
     # Need to prompt for password
     from PyQt5.QtWidgets import QDialog
-    password_dialog = PasswordDialog()
-    password_dialog.add_save_option()  # Add checkbox to save password
+    # Import here so headless callers (e.g. manage_password.py) don't pull in Qt
+    from focus_launcher import SavingPasswordDialog
+    password_dialog = SavingPasswordDialog()  # Includes checkbox to save password
     
     if password_dialog.exec_() == QDialog.Accepted:
         password = password_dialog.password
@@ -203,7 +284,7 @@ def get_sudo_password(force_new: bool = False) -> Optional[str]:
         # Verify password before saving
         if password and password_manager.verify_password(password):
             # Save password if user chose to
-            if hasattr(password_dialog, 'save_password') and password_dialog.save_password:
+            if password_dialog.save_password:
                 password_manager.save_password(password)
             return password
         else:
@@ -211,59 +292,3 @@ def get_sudo_password(force_new: bool = False) -> Optional[str]:
             return None
     
     return None
-
-
-# Import here to avoid circular imports
-from focus_launcher import PasswordDialog
-
-# Enhance the existing PasswordDialog class
-def add_save_option(self):
-    """Add save password option to existing PasswordDialog"""
-    if hasattr(self, '_save_option_added'):
-        return
-    
-    self._save_option_added = True
-    
-    from PyQt5.QtWidgets import QCheckBox
-    
-    # Find the main layout
-    layout = self.layout()
-    
-    # Add save password checkbox before buttons
-    self.save_checkbox = QCheckBox("Remember password securely")
-    self.save_checkbox.setChecked(True)  # Default to saving
-    self.save_checkbox.setStyleSheet("""
-        QCheckBox {
-            font-size: 14px;
-            color: #1d1d1f;
-            margin: 10px 0;
-        }
-        QCheckBox::indicator {
-            width: 18px;
-            height: 18px;
-        }
-        QCheckBox::indicator:unchecked {
-            border: 2px solid #d1d1d6;
-            border-radius: 3px;
-            background-color: white;
-        }
-        QCheckBox::indicator:checked {
-            border: 2px solid #007aff;
-            border-radius: 3px;
-            background-color: #007aff;
-        }
-    """)
-    
-    # Insert before the last item (which should be the button layout)
-    layout.insertWidget(layout.count() - 1, self.save_checkbox)
-    
-    # Override accept to capture save preference
-    original_accept = self.accept
-    def accept_with_save():
-        self.save_password = self.save_checkbox.isChecked()
-        original_accept()
-    
-    self.accept = accept_with_save
-
-# Monkey patch the method
-PasswordDialog.add_save_option = add_save_option
\ No newline at end of file
@@ -1,42 +1,370 @@
 #!/usr/bin/env python3
 
-from PyQt5.QtWidgets import (QMainWindow, QVBoxLayout, QHBoxLayout, QLabel, 
+from PyQt5.QtWidgets import (QMainWindow, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, 
                              QPushButton, QCheckBox, QScrollArea, QWidget, QFrame, QSpinBox,
-                             QMessageBox, QProgressDialog, QApplication)
-from PyQt5.QtCore import Qt, QTimer
-from plugin_system import plugin_manager
-from ai_service import ai_service
+                             QMessageBox, QProgressDialog, QSpacerItem, QSizePolicy)
+from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
+from plugin_system import get_plugin_manager
+import resources_rc  # Registers the :/icons/* paths used by _DIALOG_QSS
 import json
 import os
+import shutil
+from functools import partial
+
+# Shared manager; this module is only imported once the settings window is opened
+plugin_manager = get_plugin_manager()
+
+# One stylesheet for the whole dialog, applied once in init_ui; widgets are
+# matched by object name so Qt resolves styles from a single parse
+_DIALOG_QSS = """
+    QMainWindow {
+        background-color: #f0f0f0;
+    }
+    QWidget {
+        background-color: #f0f0f0;
+        font-family: Helvetica, Arial;
+    }
+    
+    QLabel#titleLabel {
+        font-size: 18px;
+        font-weight: 600;
+        color: #1d1d1f;
+    }
+    QLabel#subtitleLabel {
+        font-size: 14px;
+        color: #86868b;
+    }
+    QLabel#settingLabel {
+        font-size: 14px;
+        color: #1d1d1f;
+    }
+    
+    QSpinBox#settingSpin {
+        padding: 6px 8px;
+        font-size: 14px;
+        border: 1px solid #d1d1d6;
+        border-radius: 6px;
+        background-color: white;
+        color: #1d1d1f;
+        min-width: 120px;
+    }
+    QSpinBox#settingSpin::up-button {
+        subcontrol-origin: border;
+        subcontrol-position: top right;
+        width: 20px;
+        border-left: 1px solid #d1d1d6;
+        border-bottom: 1px solid #d1d1d6;
+        border-top-right-radius: 6px;
+        background-color: #f8f8f8;
+    }
+    QSpinBox#settingSpin::up-button:hover {
+        background-color: #e8e8e8;
+    }
+    QSpinBox#settingSpin::up-button:pressed {
+        background-color: #d8d8d8;
+    }
+    QSpinBox#settingSpin::up-arrow {
+        image: url(:/icons/arrow_up.svg);
+        width: 8px;
+        height: 6px;
+    }
+    QSpinBox#settingSpin::down-button {
+        subcontrol-origin: border;
+        subcontrol-position: bottom right;
+        width: 20px;
+        border-left: 1px solid #d1d1d6;
+        border-top: 1px solid #d1d1d6;
+        border-bottom-right-radius: 6px;
+        background-color: #f8f8f8;
+    }
+    QSpinBox#settingSpin::down-button:hover {
+        background-color: #e8e8e8;
+    }
+    QSpinBox#settingSpin::down-button:pressed {
+        background-color: #d8d8d8;
+    }
+    QSpinBox#settingSpin::down-arrow {
+        image: url(:/icons/arrow_down.svg);
+        width: 8px;
+        height: 6px;
+    }
+    
+    QPushButton#detectButton {
+        background-color: #007AFF;
+        color: white;
+        border: none;
+        border-radius: 8px;
+        padding: 10px 20px;
+        font-size: 14px;
+        font-weight: 500;
+        min-height: 20px;
+    }
+    QPushButton#detectButton:hover {
+        background-color: #0056CC;
+    }
+    QPushButton#detectButton:pressed {
+        background-color: #004499;
+    }
+    QPushButton#detectButton:disabled {
+        background-color: #cccccc;
+        color: #666666;
+    }
+    QLabel#detectLabel {
+        font-size: 12px;
+        color: #666666;
+        margin-top: 5px;
+    }
+    
+    QScrollArea#pluginScroll {
+        border: 1px solid #e0e0e0;
+        border-radius: 8px;
+        background-color: #fafafa;
+    }
+    QScrollArea#pluginScroll QScrollBar:vertical {
+        border: none;
+        background-color: #f0f0f0;
+        width: 12px;
+        border-radius: 6px;
+        margin: 0;
+    }
+    QScrollArea#pluginScroll QScrollBar::handle:vertical {
+        background-color: #c0c0c0;
+        border-radius: 6px;
+        min-height: 20px;
+        margin: 2px;
+    }
+    QScrollArea#pluginScroll QScrollBar::handle:vertical:hover {
+        background-color: #a0a0a0;
+    }
+    QScrollArea#pluginScroll QScrollBar::handle:vertical:pressed {
+        background-color: #808080;
+    }
+    QScrollArea#pluginScroll QScrollBar::add-line:vertical,
+    QScrollArea#pluginScroll QScrollBar::sub-line:vertical {
+        height: 0px;
+        subcontrol-position: top;
+        subcontrol-origin: margin;
+    }
+    QScrollArea#pluginScroll QScrollBar::add-page:vertical,
+    QScrollArea#pluginScroll QScrollBar::sub-page:vertical {
+        background: none;
+    }
+    
+    QPushButton#closeButton {
+        padding: 12px 20px;
+        font-size: 14px;
+        border: 1px solid #d1d1d6;
+        border-radius: 8px;
+        background-color: white;
+        color: #1d1d1f;
+    }
+    QPushButton#closeButton:hover { background-color: #f5f5f7; }
+    QPushButton#saveButton {
+        padding: 12px 20px;
+        font-size: 14px;
+        font-weight: 600;
+        border: none;
+        border-radius: 8px;
+        background-color: #007aff;
+        color: white;
+    }
+    QPushButton#saveButton:hover { background-color: #0056cc; }
+    
+    QLabel#noPluginsLabel, QLabel#loadingLabel {
+        font-size: 14px;
+        color: #86868b;
+        padding: 20px;
+    }
+    
+    QFrame#pluginCard, QFrame#pluginCard QFrame {
+        background-color: white;
+        border: 1px solid #e0e0e0;
+        border-radius: 8px;
+        padding: 12px;
+    }
+    QCheckBox#pluginCheck::indicator {
+        width: 18px;
+        height: 18px;
+        border-radius: 9px;
+        border: 2px solid #d1d1d6;
+        background-color: white;
+    }
+    QCheckBox#pluginCheck::indicator:checked {
+        background-color: #007aff;
+        border-color: #007aff;
+    }
+    QLabel#pluginName {
+        font-size: 16px;
+        font-weight: 600;
+        color: #1d1d1f;
+    }
+    QFrame#pluginCard QLabel#pluginVersion {
+        font-size: 12px;
+        color: #86868b;
+        background-color: #f0f0f0;
+        padding: 2px 8px;
+        border-radius: 4px;
+    }
+    QPushButton#configEmailButton {
+        padding: 6px 12px;
+        font-size: 12px;
+        font-weight: 500;
+        border: 1px solid #007aff;
+        border-radius: 6px;
+        background-color: white;
+        color: #007aff;
+    }
+    QPushButton#configEmailButton:hover { background-color: #f0f8ff; }
+    QLabel#pluginDescription {
+        font-size: 13px;
+        color: #4a4a4a;
+        line-height: 1.4;
+    }
+    QLabel#pluginStatus {
+        font-size: 12px;
+        color: #86868b;
+        font-style: italic;
+        margin-top: 4px;
+    }
+"""
+
+# Paths are fixed for the life of the process
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+_SETTINGS_FILE = os.path.join(_SCRIPT_DIR, 'plugin_settings.json')
+_MODES_DIR = os.path.join(_SCRIPT_DIR, 'modes')
+_HOSTS_DIR = os.path.join(_SCRIPT_DIR, 'hosts')
+
+# Last parsed plugin_settings.json, keyed by (path, st_mtime_ns) so unchanged
+# files are never re-read or re-parsed
+_settings_cache = {"key": None, "data": None}
+
+def _load_settings(settings_file):
+    """Return the parsed settings file ({} if missing); treat the result as read-only"""
+    try:
+        key = (settings_file, os.stat(settings_file).st_mtime_ns)
+    except FileNotFoundError:
+        return {}
+    
+    if _settings_cache["key"] != key:
+        with open(settings_file, 'r') as f:
+            _settings_cache["data"] = json.load(f)
+        _settings_cache["key"] = key
+    return _settings_cache["data"]
+
+def _store_settings(settings_file, settings):
+    """Atomically write the settings file and prime the cache with what was written"""
+    payload = json.dumps(settings, indent=2).encode('utf-8')
+    
+    # Write a sibling temp file and swap it in so readers never see a torn file
+    tmp_file = settings_file + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(payload)
+        # Make sure the data is on disk before the rename can make it visible
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, settings_file)
+    _settings_cache["key"] = (settings_file, os.stat(settings_file).st_mtime_ns)
+    _settings_cache["data"] = settings
+
+# Height reserved for a plugin card before it is built (roughly one real card)
+_CARD_PLACEHOLDER_HEIGHT = 140
+
+# Hosts-file entries generated per blocked site by _update_mode_files(), kept
+# as ready-made byte prefixes so each line is one concatenation with the site
+_BASE_HOST_PREFIXES = tuple(b'127.0.0.1 ' + sub for sub in (
+    b'', b'www.', b'm.', b'mobile.', b'touch.', b'app.', b'apps.', b'api.', b'cdn.', b'static.', b'assets.'))
+_URL_SCHEMES = ('https://', 'http://')
+_SOCIAL_MARKERS = ('facebook', 'instagram', 'twitter', 'tiktok')
+_SOCIAL_HOST_PREFIXES = tuple(b'127.0.0.1 ' + sub for sub in (b'graph.', b'connect.', b'login.', b'auth.'))
+_YOUTUBE_HOST_LINES = (
+    b'127.0.0.1 youtubei.googleapis.com\n'
+    b'127.0.0.1 youtube-ui.l.google.com\n'
+    b'127.0.0.1 youtu.be\n'
+    b'127.0.0.1 www.youtu.be\n'
+)
+
+# (prefixes, extra lines) per site kind, keyed by (is_social, is_youtube), so
+# each site is classified once and then emitted without further branching
+_HOST_TEMPLATES = {
+    (False, False): (_BASE_HOST_PREFIXES, b''),
+    (True, False): (_BASE_HOST_PREFIXES + _SOCIAL_HOST_PREFIXES, b''),
+    (False, True): (_BASE_HOST_PREFIXES, _YOUTUBE_HOST_LINES),
+    (True, True): (_BASE_HOST_PREFIXES + _SOCIAL_HOST_PREFIXES, _YOUTUBE_HOST_LINES),
+}
+
+class DetectProgramsWorker(QThread):
+    """Background thread for AI program detection to prevent UI freezing"""
+    progress_changed = pyqtSignal(int)  # percent complete
+    detection_ready = pyqtSignal(int, dict, dict)  # (apps analyzed, app_categories, site_categories)
+    error_occurred = pyqtSignal(str)  # error message
+    
+    def __init__(self):
+        super().__init__()
+        self._cancel = False
+    
+    def request_cancel(self):
+        """Stop after the current stage; results of a cancelled run are discarded"""
+        self._cancel = True
+    
+    def run(self):
+        """Fetch and categorize apps and websites, checking for cancel between stages"""
+        from ai_service import ai_service
+        
+        try:
+            # Get installed applications
+            print("Getting installed applications...")
+            apps = ai_service.get_installed_applications()
+            if self._cancel:
+                return
+            self.progress_changed.emit(30)
+            
+            # Categorize apps
+            print("Categorizing applications with AI...")
+            app_categories = ai_service.categorize_apps_for_modes(apps)
+            if self._cancel:
+                return
+            self.progress_changed.emit(60)
+            
+            # Generate website blocks
+            print("Generating website blocks...")
+            site_categories = ai_service.generate_website_blocks_for_modes()
+            if self._cancel:
+                return
+            self.progress_changed.emit(80)
+            
+            self.detection_ready.emit(len(apps), app_categories, site_categories)
+            
+        except Exception as e:
+            if not self._cancel:
+                self.error_occurred.emit(str(e))
 
 class PluginSettingsDialog(QMainWindow):
     def __init__(self, parent=None):
         super().__init__(parent)
+        
+        # Email plugin status text per plugin id, dropped when the plugin is reconfigured
+        self._status_cache = {}
+        
+        # Message boxes reused across detection runs, keyed by (icon, title)
+        self._message_boxes = {}
+        
+        # Background program detection run, if one is in progress
+        self._detect_worker = None
+        self._detect_progress = None
+        
         self.init_ui()
     
     def init_ui(self):
         self.setWindowTitle('Focus Utility - Settings')
         self.setFixedSize(700, 650)
         
-        # Normal window behavior for configuration dialogs
-        self.setWindowFlags(Qt.Window)
-        
-        # Set window to come to front initially but not stay on top
-        self.setAttribute(Qt.WA_ShowWithoutActivating, False)  # Allow activation
+        # QMainWindow is already a normal, activatable top-level Qt.Window
         
         # Create central widget
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
         
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #f0f0f0;
-            }
-            QWidget {
-                background-color: #f0f0f0;
-                font-family: Helvetica, Arial;
-            }
-        """)
+        self.setStyleSheet(_DIALOG_QSS)
         
         layout = QVBoxLayout()
         layout.setContentsMargins(30, 30, 30, 30)
@@ -45,21 +373,14 @@ class PluginSettingsDialog(QMainWindow):
         # Title
         title = QLabel("Plugins & Settings")
         title.setAlignment(Qt.AlignCenter)
-        title.setStyleSheet("""
-            font-size: 18px;
-            font-weight: 600;
-            color: #1d1d1f;
-        """)
+        title.setObjectName("titleLabel")
         layout.addWidget(title)
         
         # Subtitle
         subtitle = QLabel("Enable or disable plugins and customize your focus experience")
         subtitle.setAlignment(Qt.AlignCenter)
         subtitle.setWordWrap(True)
-        subtitle.setStyleSheet("""
-            font-size: 14px;
-            color: #86868b;
-        """)
+        subtitle.setObjectName("subtitleLabel")
         layout.addWidget(subtitle)
         
         # App Settings Section (compact, no frame)
@@ -70,78 +391,16 @@ class PluginSettingsDialog(QMainWindow):
         # Popup interval setting
         popup_row = QHBoxLayout()
         interval_label = QLabel("How often should we check in?:")
-        interval_label.setStyleSheet("""
-            font-size: 14px;
-            color: #1d1d1f;
-        """)
+        interval_label.setObjectName("settingLabel")
         
         self.popup_interval_spinbox = QSpinBox()
         self.popup_interval_spinbox.setMinimum(1) 
         self.popup_interval_spinbox.setMaximum(60)
         self.popup_interval_spinbox.setSuffix(" minutes")
         self.popup_interval_spinbox.setValue(self.get_popup_interval_setting())
-        
-        spinbox_style = """
-            QSpinBox {
-                padding: 6px 8px;
-                font-size: 14px;
-                border: 1px solid #d1d1d6;
-                border-radius: 6px;
-                background-color: white;
-                color: #1d1d1f;
-                min-width: 120px;
-            }
-            QSpinBox::up-button {
-                subcontrol-origin: border;
-                subcontrol-position: top right;
-                width: 20px;
-                border-left: 1px solid #d1d1d6;
-                border-bottom: 1px solid #d1d1d6;
-                border-top-right-radius: 6px;
-                background-color: #f8f8f8;
-            }
-            QSpinBox::up-button:hover {
-                background-color: #e8e8e8;
-            }
-            QSpinBox::up-button:pressed {
-                background-color: #d8d8d8;
-            }
-            QSpinBox::up-arrow {
-                image: none;
-                width: 0;
-                height: 0;
-                border-left: 4px solid transparent;
-                border-right: 4px solid transparent;
-                border-bottom: 6px solid #666;
-                margin-bottom: 2px;
-            }
-            QSpinBox::down-button {
-                subcontrol-origin: border;
-                subcontrol-position: bottom right;
-                width: 20px;
-                border-left: 1px solid #d1d1d6;
-                border-top: 1px solid #d1d1d6;
-                border-bottom-right-radius: 6px;
-                background-color: #f8f8f8;
-            }
-            QSpinBox::down-button:hover {
-                background-color: #e8e8e8;
-            }
-            QSpinBox::down-button:pressed {
-                background-color: #d8d8d8;
-            }
-            QSpinBox::down-arrow {
-                image: none;
-                width: 0;
-                height: 0;
-                border-left: 4px solid transparent;
-                border-right: 4px solid transparent;
-                border-top: 6px solid #666;
-                margin-top: 2px;
-            }
-        """
-        
-        self.popup_interval_spinbox.setStyleSheet(spinbox_style)
+        self.popup_interval_spinbox.setObjectName("settingSpin")
+        self.popup_interval_spinbox.setKeyboardTracking(False)
+        self.popup_interval_spinbox.setAccelerated(True)
         
         popup_row.addWidget(interval_label)
         popup_row.addStretch()
@@ -150,17 +409,16 @@ class PluginSettingsDialog(QMainWindow):
         # Breath duration setting
         breath_row = QHBoxLayout()
         breath_label = QLabel("Breath screen duration:")
-        breath_label.setStyleSheet("""
-            font-size: 14px;
-            color: #1d1d1f;
-        """)
+        breath_label.setObjectName("settingLabel")
         
         self.breath_duration_spinbox = QSpinBox()
         self.breath_duration_spinbox.setMinimum(5)
         self.breath_duration_spinbox.setMaximum(60)
         self.breath_duration_spinbox.setSuffix(" seconds")
         self.breath_duration_spinbox.setValue(self.get_breath_duration_setting())
-        self.breath_duration_spinbox.setStyleSheet(spinbox_style)
+        self.breath_duration_spinbox.setObjectName("settingSpin")
+        self.breath_duration_spinbox.setKeyboardTracking(False)
+        self.breath_duration_spinbox.setAccelerated(True)
         
         breath_row.addWidget(breath_label)
         breath_row.addStretch()
@@ -178,36 +436,11 @@ class PluginSettingsDialog(QMainWindow):
         
         # Detect Programs button
         detect_button = QPushButton("Detect Programs")
-        detect_button.setStyleSheet("""
-            QPushButton {
-                background-color: #007AFF;
-                color: white;
-                border: none;
-                border-radius: 8px;
-                padding: 10px 20px;
-                font-size: 14px;
-                font-weight: 500;
-                min-height: 20px;
-            }
-            QPushButton:hover {
-                background-color: #0056CC;
-            }
-            QPushButton:pressed {
-                background-color: #004499;
-            }
-            QPushButton:disabled {
-                background-color: #cccccc;
-                color: #666666;
-            }
-        """)
+        detect_button.setObjectName("detectButton")
         detect_button.clicked.connect(self.detect_programs)
         
         detect_label = QLabel("Use AI to analyze your installed apps and websites, automatically configuring focus modes for optimal productivity")
-        detect_label.setStyleSheet("""
-            font-size: 12px;
-            color: #666666;
-            margin-top: 5px;
-        """)
+        detect_label.setObjectName("detectLabel")
         detect_label.setWordWrap(True)
         
         ai_settings_layout.addWidget(detect_button)
@@ -215,54 +448,37 @@ class PluginSettingsDialog(QMainWindow):
         layout.addLayout(ai_settings_layout)
         
         # Plugins scroll area
-        scroll = QScrollArea()
+        self.plugin_scroll = scroll = QScrollArea()
         scroll.setWidgetResizable(True)
         scroll.setMinimumHeight(400)  # Make plugins section taller
-        scroll.setStyleSheet("""
-            QScrollArea {
-                border: 1px solid #e0e0e0;
-                border-radius: 8px;
-                background-color: #fafafa;
-            }
-            QScrollBar:vertical {
-                border: none;
-                background-color: #f0f0f0;
-                width: 12px;
-                border-radius: 6px;
-                margin: 0;
-            }
-            QScrollBar::handle:vertical {
-                background-color: #c0c0c0;
-                border-radius: 6px;
-                min-height: 20px;
-                margin: 2px;
-            }
-            QScrollBar::handle:vertical:hover {
-                background-color: #a0a0a0;
-            }
-            QScrollBar::handle:vertical:pressed {
-                background-color: #808080;
-            }
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                height: 0px;
-                subcontrol-position: top;
-                subcontrol-origin: margin;
-            }
-            QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical {
-                background: none;
-            }
-        """)
+        scroll.setObjectName("pluginScroll")
         
         plugins_widget = QWidget()
         self.plugins_layout = QVBoxLayout(plugins_widget)
         self.plugins_layout.setSpacing(12)
         self.plugins_layout.setContentsMargins(15, 15, 15, 15)
         
-        # Load plugins
+        # Plugins are loaded on first show (see showEvent) so the window appears first
         self.plugin_checkboxes = {}
-        self.load_plugins()
+        self._plugin_status_labels = {}
+        self._pending_cards = []
+        self._populated = False
+        self._loading_label = QLabel("Loading plugins…")
+        self._loading_label.setAlignment(Qt.AlignCenter)
+        self._loading_label.setObjectName("loadingLabel")
+        self.plugins_layout.addWidget(self._loading_label)
+        
+        # Built once and toggled by load_plugins()
+        self._no_plugins_label = QLabel("No plugins found in the plugins directory")
+        self._no_plugins_label.setAlignment(Qt.AlignCenter)
+        self._no_plugins_label.setObjectName("noPluginsLabel")
+        self._no_plugins_label.hide()
+        self.plugins_layout.addWidget(self._no_plugins_label)
         
         scroll.setWidget(plugins_widget)
+        # Re-check on scroll and when built cards change the content height
+        scroll.verticalScrollBar().valueChanged.connect(self._build_visible_cards)
+        scroll.verticalScrollBar().rangeChanged.connect(self._build_visible_cards)
         layout.addWidget(scroll)
         
         # Buttons
@@ -270,33 +486,12 @@ class PluginSettingsDialog(QMainWindow):
         
         cancel_btn = QPushButton("Close")
         cancel_btn.clicked.connect(self.close)
-        cancel_btn.setStyleSheet("""
-            QPushButton {
-                padding: 12px 20px;
-                font-size: 14px;
-                border: 1px solid #d1d1d6;
-                border-radius: 8px;
-                background-color: white;
-                color: #1d1d1f;
-            }
-            QPushButton:hover { background-color: #f5f5f7; }
-        """)
+        cancel_btn.setObjectName("closeButton")
         
         save_btn = QPushButton("Save & Close")
         save_btn.clicked.connect(self.save_and_close)
         save_btn.setDefault(True)
-        save_btn.setStyleSheet("""
-            QPushButton {
-                padding: 12px 20px;
-                font-size: 14px;
-                font-weight: 600;
-                border: none;
-                border-radius: 8px;
-                background-color: #007aff;
-                color: white;
-            }
-            QPushButton:hover { background-color: #0056cc; }
-        """)
+        save_btn.setObjectName("saveButton")
         
         button_layout.addStretch()
         button_layout.addWidget(cancel_btn)
@@ -314,126 +509,121 @@ class PluginSettingsDialog(QMainWindow):
         """Load all available plugins into the UI"""
         available_plugins = plugin_manager.get_available_plugins()
         
+        # Show no plugins message only when there is nothing to list
+        self._no_plugins_label.setVisible(not available_plugins)
         if not available_plugins:
-            # Show no plugins message
-            no_plugins_label = QLabel("No plugins found in the plugins directory")
-            no_plugins_label.setAlignment(Qt.AlignCenter)
-            no_plugins_label.setStyleSheet("""
-                font-size: 14px;
-                color: #86868b;
-                padding: 20px;
-            """)
-            self.plugins_layout.addWidget(no_plugins_label)
             return
         
-        for plugin_id, manifest in available_plugins.items():
-            # Create plugin card
-            plugin_frame = QFrame()
-            plugin_frame.setStyleSheet("""
-                QFrame {
-                    background-color: white;
-                    border: 1px solid #e0e0e0;
-                    border-radius: 8px;
-                    padding: 12px;
-                }
-            """)
-            
-            plugin_layout = QVBoxLayout(plugin_frame)
-            plugin_layout.setSpacing(8)
-            plugin_layout.setContentsMargins(12, 12, 12, 12)
-            
-            # Plugin header with checkbox and name
-            header_layout = QHBoxLayout()
-            
-            checkbox = QCheckBox()
-            checkbox.setChecked(plugin_manager.is_plugin_enabled(plugin_id))
-            checkbox.setStyleSheet("""
-                QCheckBox::indicator {
-                    width: 18px;
-                    height: 18px;
-                    border-radius: 9px;
-                    border: 2px solid #d1d1d6;
-                    background-color: white;
-                }
-                QCheckBox::indicator:checked {
-                    background-color: #007aff;
-                    border-color: #007aff;
-                }
-            """)
-            
-            plugin_name = QLabel(manifest['name'])
-            plugin_name.setStyleSheet("""
-                font-size: 16px;
-                font-weight: 600;
-                color: #1d1d1f;
-            """)
-            
-            version_label = QLabel(f"v{manifest['version']}")
-            version_label.setStyleSheet("""
-                font-size: 12px;
-                color: #86868b;
-                background-color: #f0f0f0;
-                padding: 2px 8px;
-                border-radius: 4px;
-            """)
-            
-            header_layout.addWidget(checkbox)
-            header_layout.addWidget(plugin_name)
-            header_layout.addWidget(version_label)
-            header_layout.addStretch()
-            
-            # Add configure button for email plugin
-            if plugin_id == 'email_assistant':
-                config_btn = QPushButton("Configure Email")
-                config_btn.clicked.connect(lambda: self.configure_email_plugin(plugin_id))
-                config_btn.setStyleSheet("""
-                    QPushButton {
-                        padding: 6px 12px;
-                        font-size: 12px;
-                        font-weight: 500;
-                        border: 1px solid #007aff;
-                        border-radius: 6px;
-                        background-color: white;
-                        color: #007aff;
-                    }
-                    QPushButton:hover { background-color: #f0f8ff; }
-                """)
-                header_layout.addWidget(config_btn)
-            
-            plugin_layout.addLayout(header_layout)
-            
-            # Plugin description
-            description = QLabel(manifest['description'])
-            description.setWordWrap(True)
-            description.setStyleSheet("""
-                font-size: 13px;
-                color: #4a4a4a;
-                line-height: 1.4;
-            """)
-            plugin_layout.addWidget(description)
-            
-            # Add status for email plugin
-            if plugin_id == 'email_assistant':
-                status_text = self.get_email_plugin_status(plugin_id)
-                status_label = QLabel(status_text)
-                status_label.setStyleSheet("""
-                    font-size: 12px;
-                    color: #86868b;
-                    font-style: italic;
-                    margin-top: 4px;
-                """)
-                plugin_layout.addWidget(status_label)
-            
-            self.plugins_layout.addWidget(plugin_frame)
-            self.plugin_checkboxes[plugin_id] = checkbox
+        # Reserve space with spacer items (plain layout items, not widgets) so
+        # off-screen plugins cost no QObjects; real cards are built once they
+        # scroll into (or near) the viewport
+        # Pull out just the label texts a card shows, for all plugins in one pass
+        card_infos = [(m['name'], f"v{m['version']}", m['description']) for m in available_plugins.values()]
+        for plugin_id, card_info in zip(available_plugins, card_infos):
+            placeholder = QSpacerItem(0, _CARD_PLACEHOLDER_HEIGHT, QSizePolicy.Minimum, QSizePolicy.Fixed)
+            self.plugins_layout.addItem(placeholder)
+            self._pending_cards.append((plugin_id, card_info, placeholder))
+        
+        QTimer.singleShot(0, self._build_visible_cards)
+    
+    def _build_visible_cards(self):
+        """Replace placeholders near the visible part of the scroll area with real cards"""
+        if not self._pending_cards:
+            return
+        
+        # Look one viewport ahead so cards are ready before they scroll in
+        viewport_height = self.plugin_scroll.viewport().height()
+        top = self.plugin_scroll.verticalScrollBar().value()
+        bottom = top + 2 * viewport_height
+        
+        enabled = plugin_manager.get_enabled_plugins()
+        still_pending = []
+        
+        # Suspend repaints while inserting so a batch of cards costs one relayout/paint
+        plugins_widget = self.plugin_scroll.widget()
+        plugins_widget.setUpdatesEnabled(False)
+        try:
+            for plugin_id, card_info, placeholder in self._pending_cards:
+                geometry = placeholder.geometry()
+                if geometry.bottom() >= top and geometry.top() <= bottom:
+                    card = self._create_plugin_card(plugin_id, card_info, plugin_id in enabled)
+                    index = self.plugins_layout.indexOf(placeholder)
+                    self.plugins_layout.takeAt(index)
+                    self.plugins_layout.insertWidget(index, card)
+                else:
+                    still_pending.append((plugin_id, card_info, placeholder))
+        finally:
+            plugins_widget.setUpdatesEnabled(True)
+        self._pending_cards = still_pending
+    
+    def _create_plugin_card(self, plugin_id, card_info, is_enabled):
+        """Build the card widget for one plugin from its (name, version text, description)"""
+        name, version_text, description_text = card_info
+        plugin_frame = QFrame()
+        plugin_frame.setObjectName("pluginCard")
+        
+        # One grid per card (header on row 0, text rows below) instead of
+        # nested box layouts
+        plugin_layout = QGridLayout(plugin_frame)
+        plugin_layout.setSpacing(8)
+        plugin_layout.setContentsMargins(12, 12, 12, 12)
+        plugin_layout.setColumnStretch(3, 1)
+        
+        # Plugin header with checkbox and name
+        checkbox = QCheckBox()
+        checkbox.setChecked(is_enabled)
+        checkbox.setObjectName("pluginCheck")
+        # Connected after the initial setChecked so building the card doesn't toggle anything
+        checkbox.toggled.connect(partial(self._on_plugin_toggled, plugin_id))
+        
+        plugin_name = QLabel(name)
+        plugin_name.setObjectName("pluginName")
+        
+        version_label = QLabel(version_text)
+        version_label.setObjectName("pluginVersion")
+        
+        plugin_layout.addWidget(checkbox, 0, 0)
+        plugin_layout.addWidget(plugin_name, 0, 1)
+        plugin_layout.addWidget(version_label, 0, 2)
+        
+        # Add configure button for email plugin
+        if plugin_id == 'email_assistant':
+            config_btn = QPushButton("Configure Email")
+            config_btn.clicked.connect(partial(self.configure_email_plugin, plugin_id))
+            config_btn.setObjectName("configEmailButton")
+            plugin_layout.addWidget(config_btn, 0, 4)
+        
+        # Plugin description
+        description = QLabel(description_text)
+        description.setWordWrap(True)
+        description.setObjectName("pluginDescription")
+        plugin_layout.addWidget(description, 1, 0, 1, 5)
+        
+        # Add status for email plugin
+        if plugin_id == 'email_assistant':
+            status_text = self.get_email_plugin_status(plugin_id)
+            status_label = QLabel(status_text)
+            status_label.setObjectName("pluginStatus")
+            plugin_layout.addWidget(status_label, 2, 0, 1, 5)
+            self._plugin_status_labels[plugin_id] = status_label
+        
+        self.plugin_checkboxes[plugin_id] = checkbox
+        return plugin_frame
     
     def get_email_plugin_status(self, plugin_id):
-        """Get status text for email plugin configuration"""
+        """Get status text for email plugin configuration (cached until reconfigured)"""
+        status = self._status_cache.get(plugin_id)
+        if status is None:
+            status = self._status_cache[plugin_id] = self._compute_email_plugin_status(plugin_id)
+        return status
+    
+    def _compute_email_plugin_status(self, plugin_id):
+        """Build the status text for email plugin configuration"""
         if plugin_id == 'email_assistant':
             try:
                 # Check if plugin is loaded and has configuration
-                if plugin_id in plugin_manager.loaded_plugins:
-                    plugin_instance = plugin_manager.loaded_plugins[plugin_id]
+                plugin_instance = plugin_manager.get_plugin(plugin_id)
+                if plugin_instance is not None:
                     if hasattr(plugin_instance, 'email_config') and plugin_instance.email_config:
                         email = plugin_instance.email_config.get('email', 'unknown')
                         provider = plugin_instance.email_config.get('provider', 'Unknown')
@@ -446,127 +636,160 @@ class PluginSettingsDialog(QMainWindow):
                 return "Error checking configuration status"
         return ""
     
-    def configure_email_plugin(self, plugin_id):
-        """Configure the email plugin"""
+    def configure_email_plugin(self, plugin_id, checked=False):
+        """Configure the email plugin (checked is the unused clicked() argument)"""
         if plugin_id == 'email_assistant':
+            plugin_instance = plugin_manager.get_plugin(plugin_id)
+            
             # Enable plugin first if not enabled
-            if not plugin_manager.is_plugin_enabled(plugin_id):
+            if plugin_instance is None or not plugin_manager.is_plugin_enabled(plugin_id):
                 plugin_manager.enable_plugin(plugin_id)
+                plugin_instance = plugin_manager.loaded_plugins.get(plugin_id)
                 # Update checkbox state
-                if plugin_id in self.plugin_checkboxes:
-                    self.plugin_checkboxes[plugin_id].setChecked(True)
+                checkbox = self.plugin_checkboxes.get(plugin_id)
+                if checkbox is not None:
+                    checkbox.setChecked(True)
             
-            # Get the plugin instance and call its configure method
-            if plugin_id in plugin_manager.loaded_plugins:
-                plugin_instance = plugin_manager.loaded_plugins[plugin_id]
+            # Call the plugin's configure method
+            if plugin_instance is not None:
                 plugin_instance.configure_email()
+            self._status_cache.pop(plugin_id, None)
+            status_label = self._plugin_status_labels.get(plugin_id)
+            if status_label is not None:
+                status_label.setText(self.get_email_plugin_status(plugin_id))
+    
+    def _on_plugin_toggled(self, plugin_id, checked):
+        """Enable or disable a plugin as soon as its checkbox changes"""
+        if checked:
+            if not plugin_manager.enable_plugin(plugin_id):
+                print(f"Could not enable plugin {plugin_id}")
+                # Put the checkbox back without re-entering this slot
+                checkbox = self.plugin_checkboxes[plugin_id]
+                checkbox.blockSignals(True)
+                checkbox.setChecked(False)
+                checkbox.blockSignals(False)
+        else:
+            plugin_manager.disable_plugin(plugin_id)
+        
+        # Status text depends on whether the plugin is loaded
+        status_label = self._plugin_status_labels.get(plugin_id)
+        if status_label is not None:
+            self._status_cache.pop(plugin_id, None)
+            status_label.setText(self.get_email_plugin_status(plugin_id))
     
     def save_changes(self):
-        """Save plugin enable/disable changes and app settings"""
-        for plugin_id, checkbox in self.plugin_checkboxes.items():
-            if checkbox.isChecked():
-                if not plugin_manager.is_plugin_enabled(plugin_id):
-                    plugin_manager.enable_plugin(plugin_id)
-            else:
-                if plugin_manager.is_plugin_enabled(plugin_id):
-                    plugin_manager.disable_plugin(plugin_id)
-        
-        # Save app settings
-        self.save_popup_interval_setting(self.popup_interval_spinbox.value())
-        self.save_breath_duration_setting(self.breath_duration_spinbox.value())
+        """Save app settings (plugin toggles are applied as they are clicked)"""
+        # Save app settings in a single write
+        # Keyboard tracking is off, so commit any half-typed value before reading
+        self.popup_interval_spinbox.interpretText()
+        self.breath_duration_spinbox.interpretText()
+        self.save_app_settings(
+            popup_interval_minutes=self.popup_interval_spinbox.value(),
+            breath_duration_seconds=self.breath_duration_spinbox.value(),
+        )
     
     def get_popup_interval_setting(self):
         """Get the popup interval setting from JSON file"""
         try:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            settings_file = os.path.join(script_dir, 'plugin_settings.json')
-            
-            if os.path.exists(settings_file):
-                with open(settings_file, 'r') as f:
-                    settings = json.load(f)
-                return settings.get('app_settings', {}).get('popup_interval_minutes', 1)
-            return 1
+            settings = _load_settings(_SETTINGS_FILE)
+            return settings.get('app_settings', {}).get('popup_interval_minutes', 1)
         except Exception:
             return 1
     
     def get_breath_duration_setting(self):
         """Get breath screen duration setting from config, default to 15 seconds"""
         try:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            settings_file = os.path.join(script_dir, 'plugin_settings.json')
-            
-            if os.path.exists(settings_file):
-                with open(settings_file, 'r') as f:
-                    settings = json.load(f)
-                return settings.get('app_settings', {}).get('breath_duration_seconds', 15)
-            return 15
+            settings = _load_settings(_SETTINGS_FILE)
+            return settings.get('app_settings', {}).get('breath_duration_seconds', 15)
         except Exception:
             return 15
     
     def save_popup_interval_setting(self, interval_minutes):
         """Save the popup interval setting to JSON file"""
-        try:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            settings_file = os.path.join(script_dir, 'plugin_settings.json')
-            
-            # Load existing settings
-            settings = {}
-            if os.path.exists(settings_file):
-                with open(settings_file, 'r') as f:
-                    settings = json.load(f)
-            
-            # Update app settings
-            if 'app_settings' not in settings:
-                settings['app_settings'] = {}
-            settings['app_settings']['popup_interval_minutes'] = interval_minutes
-            
-            # Save back to file
-            with open(settings_file, 'w') as f:
-                json.dump(settings, f, indent=2)
-                
-        except Exception as e:
-            print(f"Error saving popup interval setting: {e}")
+        self.save_app_settings(popup_interval_minutes=interval_minutes)
     
     def save_breath_duration_setting(self, duration_seconds):
         """Save the breath duration setting to JSON file"""
+        self.save_app_settings(breath_duration_seconds=duration_seconds)
+    
+    def save_app_settings(self, **values):
+        """Update several app_settings keys in the JSON file with one write"""
         try:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            settings_file = os.path.join(script_dir, 'plugin_settings.json')
-            
-            # Load existing settings
-            settings = {}
-            if os.path.exists(settings_file):
-                with open(settings_file, 'r') as f:
-                    settings = json.load(f)
-            
-            # Update app settings
-            if 'app_settings' not in settings:
-                settings['app_settings'] = {}
-            settings['app_settings']['breath_duration_seconds'] = duration_seconds
+            # Copy the cached settings so a failed write can't leave the cache modified
+            settings = dict(_load_settings(_SETTINGS_FILE))
+            settings['app_settings'] = dict(settings.get('app_settings', {}))
+            settings['app_settings'].update(values)
             
             # Save back to file
-            with open(settings_file, 'w') as f:
-                json.dump(settings, f, indent=2)
+            _store_settings(_SETTINGS_FILE, settings)
                 
         except Exception as e:
-            print(f"Error saving breath duration setting: {e}")
+            print(f"Error saving app settings: {e}")
     
     def showEvent(self, event):
         """Override showEvent to bring window to front when first shown"""
         super().showEvent(event)
         
-        # Bring window to front but don't keep it on top
-        self.raise_()
+        # First show only: build the plugin list once the window has had a
+        # chance to paint, and bring the window to front (raise_ is a
+        # window-server round-trip, so later re-shows skip it)
+        if not self._populated:
+            self._populated = True
+            QTimer.singleShot(0, self._populate_plugins)
+            self.raise_()
+        elif not event.spontaneous():
+            # Reopened via show(): keep the built cards, only reset their state.
+            # Spontaneous shows (e.g. restoring from minimize) keep unsaved edits
+            self._refresh_state()
+    
+    def _refresh_state(self):
+        """Reset controls to the saved state, discarding unsaved app setting edits"""
+        self.popup_interval_spinbox.setValue(self.get_popup_interval_setting())
+        self.breath_duration_spinbox.setValue(self.get_breath_duration_setting())
+        
+        enabled = plugin_manager.get_enabled_plugins()
+        for plugin_id, checkbox in self.plugin_checkboxes.items():
+            checkbox.blockSignals(True)
+            checkbox.setChecked(plugin_id in enabled)
+            checkbox.blockSignals(False)
+        
+        self._status_cache.clear()
+        for plugin_id, status_label in self._plugin_status_labels.items():
+            status_label.setText(self.get_email_plugin_status(plugin_id))
+    
+    def _populate_plugins(self):
+        """Swap the loading placeholder for the plugin list"""
+        self.plugins_layout.removeWidget(self._loading_label)
+        self._loading_label.deleteLater()
+        self._loading_label = None
+        self.load_plugins()
+    
+    def _show_message(self, icon, title, text, buttons=QMessageBox.Ok, default_button=QMessageBox.NoButton):
+        """Show a message box, reusing one instance per (icon, title) for this window
+        
+        Returns:
+            The clicked standard button, like the QMessageBox static helpers
+        """
+        box = self._message_boxes.get((icon, title))
+        if box is None:
+            box = QMessageBox(icon, title, "", buttons, self)
+            box.setDefaultButton(default_button)
+            self._message_boxes[(icon, title)] = box
+        box.setText(text)
+        return box.exec_()
     
     def detect_programs(self):
         """Use AI to detect and categorize programs for focus modes"""
+        # Import here so the Groq client is only loaded once detection is used
+        from ai_service import ai_service
+        
         if not ai_service.is_available():
-            QMessageBox.warning(self, "AI Service Unavailable", 
-                              "AI service is not available. Please ensure your Groq API key is configured in groq_api_key.txt")
+            self._show_message(QMessageBox.Warning, "AI Service Unavailable", 
+                               "AI service is not available. Please ensure your Groq API key is configured in groq_api_key.txt")
             return
         
         # Show confirmation dialog
-        reply = QMessageBox.question(self, "Detect Programs", 
+        reply = self._show_message(QMessageBox.Question, "Detect Programs", 
                                    "This will analyze your installed applications and websites, then automatically update your focus mode configurations.\n\n"
                                    "This may take a few minutes and will overwrite existing mode configurations.\n\n"
                                    "Continue?",
@@ -576,47 +799,36 @@ class PluginSettingsDialog(QMainWindow):
         if reply != QMessageBox.Yes:
             return
         
+        # Prevent overlapping runs (a cancelled run finishes its current AI call first)
+        if self._detect_worker is not None:
+            print("Program detection already in progress, ignoring new request")
+            return
+        
         # Show progress dialog
         progress = QProgressDialog("Analyzing programs and generating focus modes...", "Cancel", 0, 100, self)
         progress.setWindowTitle("AI Program Detection")
         progress.setMinimumDuration(0)
         progress.setValue(10)
-        
-        QApplication.processEvents()
-        
+        self._detect_progress = progress
+        
+        # Run the slow AI calls in a background thread so the event loop keeps
+        # painting the progress dialog; results come back via signals
+        self._detect_worker = DetectProgramsWorker()
+        self._detect_worker.progress_changed.connect(progress.setValue)
+        self._detect_worker.detection_ready.connect(self._on_detect_finished)
+        self._detect_worker.error_occurred.connect(self._on_detect_error)
+        self._detect_worker.finished.connect(self._on_detect_thread_finished)
+        progress.canceled.connect(self._detect_worker.request_cancel)
+        self._detect_worker.start()
+    
+    def _on_detect_finished(self, apps_count: int, app_categories: dict, site_categories: dict):
+        """Write the detected configuration to the mode files (runs on the UI thread)"""
+        progress = self._detect_progress
         try:
-            # Get installed applications
-            print("Getting installed applications...")
-            apps = ai_service.get_installed_applications()
-            progress.setValue(30)
-            QApplication.processEvents()
-            
-            if progress.wasCanceled():
-                return
-            
-            # Categorize apps
-            print("Categorizing applications with AI...")
-            app_categories = ai_service.categorize_apps_for_modes(apps)
-            progress.setValue(60)
-            QApplication.processEvents()
-            
-            if progress.wasCanceled():
-                return
-            
-            # Generate website blocks
-            print("Generating website blocks...")
-            site_categories = ai_service.generate_website_blocks_for_modes()
-            progress.setValue(80)
-            QApplication.processEvents()
-            
-            if progress.wasCanceled():
-                return
-            
             # Update mode files
             print("Updating focus mode configurations...")
             self._update_mode_files(app_categories, site_categories)
             progress.setValue(100)
-            QApplication.processEvents()
             
             progress.close()
             
@@ -624,33 +836,40 @@ class PluginSettingsDialog(QMainWindow):
             total_apps = sum(len(apps) for apps in app_categories.values())
             total_sites = sum(len(sites) for sites in site_categories.values())
             
-            QMessageBox.information(self, "Detection Complete", 
-                                  f"Successfully analyzed and configured focus modes!\n\n"
-                                  f"{len(apps)} applications analyzed\n"
-                                  f"{total_apps} app assignments made\n"
-                                  f"{total_sites} website blocks configured\n\n"
-                                  f"Your focus modes have been optimized for your system.")
+            self._show_message(QMessageBox.Information, "Detection Complete", 
+                               f"Successfully analyzed and configured focus modes!\n\n"
+                               f"{apps_count} applications analyzed\n"
+                               f"{total_apps} app assignments made\n"
+                               f"{total_sites} website blocks configured\n\n"
+                               f"Your focus modes have been optimized for your system.")
                                   
         except Exception as e:
-            progress.close()
-            print(f"Error during program detection: {e}")
-            QMessageBox.critical(self, "Detection Error", 
-                               f"An error occurred during program detection:\n\n{str(e)}")
+            self._on_detect_error(str(e))
+    
+    def _on_detect_error(self, error_message: str):
+        """Report a failed detection run"""
+        self._detect_progress.close()
+        print(f"Error during program detection: {error_message}")
+        self._show_message(QMessageBox.Critical, "Detection Error", 
+                           f"An error occurred during program detection:\n\n{error_message}")
+    
+    def _on_detect_thread_finished(self):
+        """Release the detection worker once its thread has stopped"""
+        self._detect_worker.deleteLater()
+        self._detect_worker = None
+        self._detect_progress = None
     
     def _update_mode_files(self, app_categories: dict, site_categories: dict):
         """Update the mode and host files with AI-generated content"""
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        
         # Update apps for each mode
         for mode, apps in app_categories.items():
-            mode_file = os.path.join(script_dir, 'modes', f'{mode}.txt')
+            mode_file = os.path.join(_MODES_DIR, f'{mode}.txt')
             
             # Backup existing file
             if os.path.exists(mode_file):
                 backup_file = f'{mode_file}.backup'
                 try:
-                    import shutil
-                    shutil.copy2(mode_file, backup_file)
+                    shutil.copyfile(mode_file, backup_file)
                     print(f"Backed up existing {mode}.txt")
                 except:
                     pass
@@ -662,55 +881,43 @@ class PluginSettingsDialog(QMainWindow):
         
         # Update hosts for each mode
         for mode, sites in site_categories.items():
-            hosts_file = os.path.join(script_dir, 'hosts', f'{mode}_hosts')
+            hosts_file = os.path.join(_HOSTS_DIR, f'{mode}_hosts')
             
             # Backup existing file
             if os.path.exists(hosts_file):
                 backup_file = f'{hosts_file}.backup'
                 try:
-                    import shutil
-                    shutil.copy2(hosts_file, backup_file)
+                    shutil.copyfile(hosts_file, backup_file)
                     print(f"Backed up existing {mode}_hosts")
                 except:
                     pass
             
-            # Write new content with comprehensive blocking
-            with open(hosts_file, 'w') as f:
-                for site in sorted(sites):
-                    # Remove any protocol or path if included
-                    clean_site = site.replace('https://', '').replace('http://', '').split('/')[0]
-                    
-                    # Block the main domain and common subdomains
-                    f.write(f'127.0.0.1 {clean_site}\n')
-                    f.write(f'127.0.0.1 www.{clean_site}\n')
-                    f.write(f'127.0.0.1 m.{clean_site}\n')
-                    f.write(f'127.0.0.1 mobile.{clean_site}\n')
-                    f.write(f'127.0.0.1 touch.{clean_site}\n')
-                    f.write(f'127.0.0.1 app.{clean_site}\n')
-                    f.write(f'127.0.0.1 apps.{clean_site}\n')
-                    f.write(f'127.0.0.1 api.{clean_site}\n')
-                    f.write(f'127.0.0.1 cdn.{clean_site}\n')
-                    f.write(f'127.0.0.1 static.{clean_site}\n')
-                    f.write(f'127.0.0.1 assets.{clean_site}\n')
-                    
-                    # For social media sites, add specific common subdomains
-                    if any(social in clean_site for social in ['facebook', 'instagram', 'twitter', 'tiktok']):
-                        f.write(f'127.0.0.1 graph.{clean_site}\n')
-                        f.write(f'127.0.0.1 connect.{clean_site}\n')
-                        f.write(f'127.0.0.1 login.{clean_site}\n')
-                        f.write(f'127.0.0.1 auth.{clean_site}\n')
-                    
-                    # For YouTube, block additional Google domains
-                    if 'youtube' in clean_site:
-                        f.write('127.0.0.1 youtubei.googleapis.com\n')
-                        f.write('127.0.0.1 youtube-ui.l.google.com\n')
-                        f.write('127.0.0.1 youtu.be\n')
-                        f.write('127.0.0.1 www.youtu.be\n')
+            # Build the content with comprehensive blocking, then write it once
+            lines = []
+            social_sites = youtube_sites = 0
+            for site in sorted(sites):
+                # Remove any protocol or path if included
+                if site.startswith(_URL_SCHEMES):
+                    site = site.partition('://')[2]
+                clean_site = site.partition('/')[0]
+                
+                # Block the main domain and common subdomains, plus login/API
+                # subdomains for social media sites and extra Google domains
+                # for YouTube
+                kind = (any(social in clean_site for social in _SOCIAL_MARKERS), 'youtube' in clean_site)
+                prefixes, extra_lines = _HOST_TEMPLATES[kind]
+                social_sites += kind[0]
+                youtube_sites += kind[1]
+                
+                site_end = clean_site.encode('utf-8') + b'\n'
+                lines.extend(prefix + site_end for prefix in prefixes)
+                lines.append(extra_lines)
+            
+            with open(hosts_file, 'wb') as f:
+                f.write(b''.join(lines))
             
             # Count total entries for more accurate reporting
             total_entries = len(sites) * 11  # Base entries per site
-            social_sites = sum(1 for site in sites if any(social in site for social in ['facebook', 'instagram', 'twitter', 'tiktok']))
-            youtube_sites = sum(1 for site in sites if 'youtube' in site)
             total_entries += social_sites * 4  # Additional social media entries
             total_entries += youtube_sites * 4  # Additional YouTube entries
             
@@ -1,22 +1,50 @@
 #!/usr/bin/env python3
 
 import os
-import json
 import importlib.util
+import logging
 import sys
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, FrozenSet, Tuple, Callable, Mapping
 from abc import ABC, abstractmethod
 from PyQt5.QtCore import QObject, pyqtSignal
 
+# Prefer orjson for manifest/settings (de)serialization; fall back to stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    import json
+    _json_loads = json.loads
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode('utf-8')
+
+# Debug output is off unless FOCUS_DEBUG is set; %-style arguments mean the
+# messages aren't even formatted otherwise
+logger = logging.getLogger(__name__)
+if os.environ.get('FOCUS_DEBUG'):
+    logging.basicConfig(format='DEBUG: %(message)s')
+    logger.setLevel(logging.DEBUG)
+
 class PluginBase(ABC):
     """Base class that all plugins must inherit from"""
     
+    # Fixed slots for the base fields; subclasses without __slots__ still get a __dict__
+    __slots__ = ('name', 'version', 'description', 'enabled', '_progress_popup',
+                 '_checklist_cache', '_checklist_cache_key')
+    
     def __init__(self):
         self.name = "Unknown Plugin"
         self.version = "1.0.0"
         self.description = "A focus utility plugin"
         self.enabled = False
         self._progress_popup = None  # Reference to ProgressPopup for API access
+        # Checklist API results for the popup's current _checklist_version
+        self._checklist_cache: Dict[str, Any] = {}
+        self._checklist_cache_key = None
     
     @abstractmethod
     def initialize(self) -> bool:
@@ -53,23 +81,36 @@ class PluginBase(ABC):
         pass
     
     # API methods for checklist interaction
+    def _cached_checklist_read(self, method_name: str, default):
+        """Call a popup checklist getter, reusing its result until the checklist changes"""
+        popup = self._progress_popup
+        if not popup:
+            return default
+        version = getattr(popup, '_checklist_version', None)
+        if version is None:  # Popup doesn't track changes; can't cache
+            return getattr(popup, method_name)()
+        
+        key = (popup, version)
+        if self._checklist_cache_key != key:
+            self._checklist_cache = {}
+            self._checklist_cache_key = key
+        try:
+            return self._checklist_cache[method_name]
+        except KeyError:
+            value = self._checklist_cache[method_name] = getattr(popup, method_name)()
+            return value
+    
     def get_checklist_progress_percentage(self) -> float:
         """Get the current checklist completion percentage (0-100)"""
-        if self._progress_popup:
-            return self._progress_popup.get_checklist_progress_percentage()
-        return 0.0
+        return self._cached_checklist_read('get_checklist_progress_percentage', 0.0)
     
     def get_completed_checklist_items(self) -> List[str]:
-        """Get list of completed checklist items"""
-        if self._progress_popup:
-            return self._progress_popup.get_completed_checklist_items()
-        return []
+        """Get list of completed checklist items (shared snapshot; don't modify it)"""
+        return self._cached_checklist_read('get_completed_checklist_items', [])
     
     def get_all_checklist_items(self) -> List[str]:
-        """Get list of all checklist items"""
-        if self._progress_popup:
-            return self._progress_popup.get_all_checklist_items()
-        return []
+        """Get list of all checklist items (shared snapshot; don't modify it)"""
+        return self._cached_checklist_read('get_all_checklist_items', [])
     
     def set_checklist_item_checked(self, item_text: str, checked: bool) -> bool:
         """Set a checklist item as checked/unchecked. Returns True if successful."""
@@ -94,6 +135,10 @@ class PluginBase(ABC):
                 return False
         return False
 
+# Hook names dispatched by the PluginManager.call_*_hooks methods (PluginBase.on_<name>)
+_HOOK_NAMES = ('goals_analyzed', 'session_start', 'session_update', 'session_end',
+               'summary_closed', 'checklist_item_changed')
+
 class PluginManager(QObject):
     """Manages loading, enabling, and disabling plugins"""
     
@@ -105,7 +150,15 @@ class PluginManager(QObject):
         self.available_plugins: Dict[str, Dict] = {}
         self.loaded_plugins: Dict[str, PluginBase] = {}
         self.enabled_plugins: List[str] = []
+        # Per hook name, (plugin_id, bound hook) for enabled, loaded plugins that
+        # override it, in enabled order; rebuilt on enable/disable/load so hook
+        # dispatch skips lookups and PluginBase's no-op defaults
+        self._hooks: Dict[str, List[Tuple[str, Callable]]] = {name: [] for name in _HOOK_NAMES}
+        # Enabled plugins whose modules haven't been imported yet; loaded on first use
+        self._pending_plugins: List[str] = []
+        self._progress_popup = None
         self.settings_file = os.path.join(os.path.dirname(__file__), 'plugin_settings.json')
+        self.manifest_cache_file = os.path.join(os.path.dirname(__file__), 'plugin_manifest_cache.json')
         
         # Ensure plugins directory exists
         os.makedirs(self.plugins_dir, exist_ok=True)
@@ -122,24 +175,71 @@ class PluginManager(QObject):
         if not os.path.exists(self.plugins_dir):
             return
         
-        for item in os.listdir(self.plugins_dir):
-            plugin_path = os.path.join(self.plugins_dir, item)
-            if os.path.isdir(plugin_path):
-                manifest_path = os.path.join(plugin_path, 'manifest.json')
-                if os.path.exists(manifest_path):
-                    try:
-                        with open(manifest_path, 'r') as f:
-                            manifest = json.load(f)
-                        
-                        # Validate required fields
-                        required_fields = ['name', 'version', 'description', 'main_file']
-                        if all(field in manifest for field in required_fields):
-                            manifest['path'] = plugin_path
-                            self.available_plugins[item] = manifest
-                        else:
-                            print(f"Plugin {item} missing required manifest fields")
-                    except Exception as e:
-                        print(f"Error reading manifest for plugin {item}: {e}")
+        # Parsed manifests from earlier runs, reused while the file is unchanged
+        cache = self._load_manifest_cache()
+        fresh_cache = {}
+        
+        # scandir entries carry their type, so only the manifest needs a stat
+        with os.scandir(self.plugins_dir) as dir_entries:
+            plugin_dirs = [(dir_entry.name, dir_entry.path) for dir_entry in dir_entries if dir_entry.is_dir()]
+        
+        # Stat/read/parse each manifest on a worker thread so slow disks overlap;
+        # results are merged here in directory order
+        if plugin_dirs:
+            with ThreadPoolExecutor(max_workers=min(32, len(plugin_dirs))) as executor:
+                results = list(executor.map(lambda d: self._read_manifest(d[0], d[1], cache.get(d[0])), plugin_dirs))
+            for item, entry, manifest in results:
+                if entry is not None:
+                    fresh_cache[item] = entry
+                if manifest is not None:
+                    self.available_plugins[item] = manifest
+        
+        if fresh_cache != cache:
+            self._save_manifest_cache(fresh_cache)
+    
+    def _read_manifest(self, item: str, plugin_path: str, cached: Optional[Dict]) -> Tuple[str, Optional[Dict], Optional[Dict]]:
+        """Read one plugin's manifest, reusing cached if still current. Returns (item, cache entry, validated manifest)."""
+        manifest_path = os.path.join(plugin_path, 'manifest.json')
+        try:
+            stat = os.stat(manifest_path)
+        except FileNotFoundError:
+            return item, None, None
+        
+        try:
+            entry = cached
+            if (not isinstance(entry, dict) or 'manifest' not in entry
+                    or entry.get('mtime_ns') != stat.st_mtime_ns or entry.get('size') != stat.st_size):
+                with open(manifest_path, 'rb') as f:
+                    entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'manifest': _json_loads(f.read())}
+            manifest = dict(entry['manifest'])
+            
+            # Validate required fields
+            required_fields = ['name', 'version', 'description', 'main_file']
+            if all(field in manifest for field in required_fields):
+                manifest['path'] = plugin_path
+                return item, entry, manifest
+            print(f"Plugin {item} missing required manifest fields")
+            return item, entry, None
+        except Exception as e:
+            print(f"Error reading manifest for plugin {item}: {e}")
+            return item, None, None
+    
+    def _load_manifest_cache(self) -> Dict[str, Dict]:
+        """Load the manifest cache ({plugin_id: {mtime_ns, size, manifest}}), or {} if unusable"""
+        try:
+            with open(self.manifest_cache_file, 'rb') as f:
+                cache = _json_loads(f.read())
+            return cache if isinstance(cache, dict) else {}
+        except Exception:
+            return {}
+    
+    def _save_manifest_cache(self, cache: Dict[str, Dict]):
+        """Save the manifest cache; failure only costs a re-parse next start"""
+        try:
+            with open(self.manifest_cache_file, 'wb') as f:
+                f.write(_json_dumps(cache))
+        except Exception as e:
+            print(f"Error saving plugin manifest cache: {e}")
     
     def load_plugin(self, plugin_id: str) -> bool:
         """Load a specific plugin"""
@@ -154,10 +254,19 @@ class PluginManager(QObject):
             plugin_path = manifest['path']
             main_file = os.path.join(plugin_path, manifest['main_file'])
             
-            # Import the plugin module
-            spec = importlib.util.spec_from_file_location(f"plugin_{plugin_id}", main_file)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
+            # Import the plugin module, reusing it if this process already ran it
+            module_name = f"plugin_{plugin_id}"
+            module = sys.modules.get(module_name)
+            if module is None:
+                spec = importlib.util.spec_from_file_location(module_name, main_file)
+                module = importlib.util.module_from_spec(spec)
+                sys.modules[module_name] = module
+                try:
+                    spec.loader.exec_module(module)
+                except BaseException:
+                    # Don't cache a half-executed module
+                    del sys.modules[module_name]
+                    raise
             
             # Get the plugin class (should be named 'Plugin')
             if hasattr(module, 'Plugin'):
@@ -165,10 +274,12 @@ class PluginManager(QObject):
                 plugin_instance.name = manifest['name']
                 plugin_instance.version = manifest['version']
                 plugin_instance.description = manifest['description']
+                plugin_instance._progress_popup = self._progress_popup
                 
                 # Initialize the plugin
                 if plugin_instance.initialize():
                     self.loaded_plugins[plugin_id] = plugin_instance
+                    self._rebuild_active()
                     return True
                 else:
                     print(f"Failed to initialize plugin {plugin_id}")
@@ -190,32 +301,78 @@ class PluginManager(QObject):
         if not self.load_plugin(plugin_id):
             return False
         
-        if plugin_id not in self.enabled_plugins:
-            self.enabled_plugins.append(plugin_id)
-            self.loaded_plugins[plugin_id].enabled = True
+        if self._mark_enabled(plugin_id):
             self.save_settings()
         
         return True
     
     def disable_plugin(self, plugin_id: str) -> bool:
         """Disable a plugin"""
-        if plugin_id in self.enabled_plugins:
-            self.enabled_plugins.remove(plugin_id)
-            if plugin_id in self.loaded_plugins:
-                self.loaded_plugins[plugin_id].enabled = False
-                self.loaded_plugins[plugin_id].cleanup()
+        if self._mark_disabled(plugin_id):
             self.save_settings()
             return True
         return False
     
+    def _mark_enabled(self, plugin_id: str) -> bool:
+        """Add a loaded plugin to the enabled list without saving. Returns True if it changed."""
+        if plugin_id in self.enabled_plugins:
+            return False
+        self.enabled_plugins.append(plugin_id)
+        self.loaded_plugins[plugin_id].enabled = True
+        self._rebuild_active()
+        return True
+    
+    def _mark_disabled(self, plugin_id: str) -> bool:
+        """Remove a plugin from the enabled list without saving. Returns True if it changed."""
+        if plugin_id not in self.enabled_plugins:
+            return False
+        self.enabled_plugins.remove(plugin_id)
+        if plugin_id in self._pending_plugins:
+            self._pending_plugins.remove(plugin_id)
+        self._rebuild_active()
+        if plugin_id in self.loaded_plugins:
+            self.loaded_plugins[plugin_id].enabled = False
+            self.loaded_plugins[plugin_id].cleanup()
+        return True
+    
+    def _rebuild_active(self):
+        """Refresh the per-hook callables used by the hook dispatchers"""
+        active = [(plugin_id, self.loaded_plugins[plugin_id])
+                  for plugin_id in self.enabled_plugins if plugin_id in self.loaded_plugins]
+        hooks = {}
+        for name in _HOOK_NAMES:
+            attr = f'on_{name}'
+            default = getattr(PluginBase, attr)
+            hooks[name] = [(plugin_id, getattr(plugin, attr)) for plugin_id, plugin in active
+                           if getattr(type(plugin), attr, default) is not default]
+        self._hooks = hooks
+    
     def load_enabled_plugins(self):
-        """Load all enabled plugins"""
-        for plugin_id in self.enabled_plugins:
+        """Queue enabled plugins to be imported the first time they are needed"""
+        self._pending_plugins = [plugin_id for plugin_id in self.enabled_plugins
+                                 if plugin_id not in self.loaded_plugins]
+    
+    def _load_pending_plugins(self):
+        """Import and initialize any enabled plugins still waiting to be loaded"""
+        pending, self._pending_plugins = self._pending_plugins, []
+        for plugin_id in pending:
+            if plugin_id in self.enabled_plugins:
+                self.load_plugin(plugin_id)
+    
+    def get_plugin(self, plugin_id: str) -> Optional[PluginBase]:
+        """Get a plugin instance, loading it first if it is enabled but not loaded yet"""
+        if plugin_id in self._pending_plugins:
+            self._pending_plugins.remove(plugin_id)
             self.load_plugin(plugin_id)
+        return self.loaded_plugins.get(plugin_id)
     
-    def get_available_plugins(self) -> Dict[str, Dict]:
-        """Get list of all available plugins"""
-        return self.available_plugins.copy()
+    def get_available_plugins(self) -> Mapping[str, Dict]:
+        """Get a read-only view of all available plugins"""
+        return MappingProxyType(self.available_plugins)
+    
+    def get_enabled_plugins(self) -> FrozenSet[str]:
+        """Get a snapshot of enabled plugin ids for repeated membership checks"""
+        return frozenset(self.enabled_plugins)
     
     def is_plugin_enabled(self, plugin_id: str) -> bool:
         """Check if a plugin is enabled"""
@@ -225,89 +382,113 @@ class PluginManager(QObject):
         """Load plugin settings from file"""
         try:
             if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    settings = json.load(f)
+                with open(self.settings_file, 'rb') as f:
+                    settings = _json_loads(f.read())
                     self.enabled_plugins = settings.get('enabled_plugins', [])
         except Exception as e:
             print(f"Error loading plugin settings: {e}")
             self.enabled_plugins = []
+        self._rebuild_active()
     
     def save_settings(self):
         """Save plugin settings to file"""
         try:
-            settings = {
-                'enabled_plugins': self.enabled_plugins
-            }
-            with open(self.settings_file, 'w') as f:
-                json.dump(settings, f, indent=2)
+            # The file is shared with app_settings written by the settings
+            # dialog, so update our key rather than replacing the whole file
+            settings = {}
+            if os.path.exists(self.settings_file):
+                with open(self.settings_file, 'rb') as f:
+                    settings = _json_loads(f.read())
+            settings['enabled_plugins'] = self.enabled_plugins
+            with open(self.settings_file, 'wb') as f:
+                f.write(_json_dumps(settings))
         except Exception as e:
             print(f"Error saving plugin settings: {e}")
     
     # Hook methods to call enabled plugins
     def call_goals_analyzed_hooks(self, goals: List[str], goals_text: str) -> List[str]:
         """Call on_goals_analyzed hooks for all enabled plugins"""
-        result_goals = goals.copy()
-        for plugin_id in self.enabled_plugins:
-            if plugin_id in self.loaded_plugins:
-                try:
-                    result_goals = self.loaded_plugins[plugin_id].on_goals_analyzed(result_goals, goals_text)
-                except Exception as e:
-                    print(f"Error in plugin {plugin_id} goals_analyzed hook: {e}")
+        if not self.enabled_plugins:
+            return goals
+        if self._pending_plugins:
+            self._load_pending_plugins()
+        # Hooks return a new list rather than mutating theirs, so no up-front copy
+        result_goals = goals
+        for plugin_id, hook in self._hooks['goals_analyzed']:
+            try:
+                result_goals = hook(result_goals, goals_text)
+            except Exception as e:
+                logger.error("Error in plugin %s goals_analyzed hook: %s", plugin_id, e)
         return result_goals
     
     def call_session_start_hooks(self, session_data: Dict[str, Any]):
         """Call on_session_start hooks for all enabled plugins"""
-        print(f"DEBUG: Calling session start hooks for plugins: {self.enabled_plugins}")
+        if not self.enabled_plugins:
+            return
+        if self._pending_plugins:
+            self._load_pending_plugins()
+        logger.debug("Calling session start hooks for plugins: %s", self.enabled_plugins)
         for plugin_id in self.enabled_plugins:
-            if plugin_id in self.loaded_plugins:
-                try:
-                    print(f"DEBUG: Calling session_start hook for plugin: {plugin_id}")
-                    self.loaded_plugins[plugin_id].on_session_start(session_data)
-                except Exception as e:
-                    print(f"Error in plugin {plugin_id} session_start hook: {e}")
-                    import traceback
-                    traceback.print_exc()
-            else:
-                print(f"DEBUG: Plugin {plugin_id} is enabled but not loaded")
+            if plugin_id not in self.loaded_plugins:
+                logger.debug("Plugin %s is enabled but not loaded", plugin_id)
+        for plugin_id, hook in self._hooks['session_start']:
+            try:
+                logger.debug("Calling session_start hook for plugin: %s", plugin_id)
+                hook(session_data)
+            except Exception:
+                logger.exception("Error in plugin %s session_start hook", plugin_id)
     
     def call_session_update_hooks(self, elapsed_minutes: float, progress_percent: float):
         """Call on_session_update hooks for all enabled plugins"""
-        for plugin_id in self.enabled_plugins:
-            if plugin_id in self.loaded_plugins:
-                try:
-                    self.loaded_plugins[plugin_id].on_session_update(elapsed_minutes, progress_percent)
-                except Exception as e:
-                    print(f"Error in plugin {plugin_id} session_update hook: {e}")
+        if not self.enabled_plugins:
+            return
+        if self._pending_plugins:
+            self._load_pending_plugins()
+        for plugin_id, hook in self._hooks['session_update']:
+            try:
+                hook(elapsed_minutes, progress_percent)
+            except Exception as e:
+                logger.error("Error in plugin %s session_update hook: %s", plugin_id, e)
     
     def call_session_end_hooks(self, session_data: Dict[str, Any]):
         """Call on_session_end hooks for all enabled plugins"""
-        for plugin_id in self.enabled_plugins:
-            if plugin_id in self.loaded_plugins:
-                try:
-                    self.loaded_plugins[plugin_id].on_session_end(session_data)
-                except Exception as e:
-                    print(f"Error in plugin {plugin_id} session_end hook: {e}")
+        if not self.enabled_plugins:
+            return
+        if self._pending_plugins:
+            self._load_pending_plugins()
+        for plugin_id, hook in self._hooks['session_end']:
+            try:
+                hook(session_data)
+            except Exception as e:
+                logger.error("Error in plugin %s session_end hook: %s", plugin_id, e)
     
     def call_summary_closed_hooks(self, session_data: Dict[str, Any]):
         """Call on_summary_closed hooks for all enabled plugins"""
-        for plugin_id in self.enabled_plugins:
-            if plugin_id in self.loaded_plugins:
-                try:
-                    self.loaded_plugins[plugin_id].on_summary_closed(session_data)
-                except Exception as e:
-                    print(f"Error in plugin {plugin_id} summary_closed hook: {e}")
+        if not self.enabled_plugins:
+            return
+        if self._pending_plugins:
+            self._load_pending_plugins()
+        for plugin_id, hook in self._hooks['summary_closed']:
+            try:
+                hook(session_data)
+            except Exception as e:
+                logger.error("Error in plugin %s summary_closed hook: %s", plugin_id, e)
     
     def call_checklist_item_changed_hooks(self, item_text: str, is_checked: bool):
         """Call on_checklist_item_changed hooks for all enabled plugins"""
-        for plugin_id in self.enabled_plugins:
-            if plugin_id in self.loaded_plugins:
-                try:
-                    self.loaded_plugins[plugin_id].on_checklist_item_changed(item_text, is_checked)
-                except Exception as e:
-                    print(f"Error in plugin {plugin_id} checklist_item_changed hook: {e}")
+        if not self.enabled_plugins:
+            return
+        if self._pending_plugins:
+            self._load_pending_plugins()
+        for plugin_id, hook in self._hooks['checklist_item_changed']:
+            try:
+                hook(item_text, is_checked)
+            except Exception as e:
+                logger.error("Error in plugin %s checklist_item_changed hook: %s", plugin_id, e)
     
     def set_progress_popup_reference(self, progress_popup):
-        """Set the progress popup reference for all loaded plugins"""
+        """Set the progress popup reference for all loaded plugins (and ones loaded later)"""
+        self._progress_popup = progress_popup
         for plugin in self.loaded_plugins.values():
             plugin._progress_popup = progress_popup
     
@@ -319,5 +500,12 @@ class PluginManager(QObject):
             except Exception as e:
                 print(f"Error cleaning up plugin: {e}")
 
-# Global plugin manager instance
-plugin_manager = PluginManager()
\ No newline at end of file
+# Shared plugin manager, created on first use so importing this module stays cheap
+_plugin_manager: Optional[PluginManager] = None
+
+def get_plugin_manager() -> PluginManager:
+    """Get the shared PluginManager, creating it on first call"""
+    global _plugin_manager
+    if _plugin_manager is None:
+        _plugin_manager = PluginManager()
+    return _plugin_manager
\ No newline at end of file
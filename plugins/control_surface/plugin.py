@@ -1,12 +1,8 @@
-import sys
-import os
 from abc import ABC, abstractmethod
 from typing import Dict, List, Any
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QDialog
 
-# Add parent directories to path to import plugin_system
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from plugin_system import PluginBase
 
 # Import controlsniffer functions
@@ -25,7 +21,8 @@ except ImportError:
 def end_session_event():
     """End the current session - callable from controlsniffer"""
     try:
-        from plugin_system import plugin_manager
+        from plugin_system import get_plugin_manager
+        plugin_manager = get_plugin_manager()
         # Get the control surface plugin instance
         if 'control_surface' in plugin_manager.loaded_plugins:
             plugin_instance = plugin_manager.loaded_plugins['control_surface']
@@ -2,31 +2,59 @@
 
 import serial
 import serial.tools.list_ports
+import logging
 import os
+import re
+import selectors
+import socket
 import time
 import subprocess
 import sys
+from collections import namedtuple
 
-# Add current directory to path so we can import from plugin.py
-sys.path.append(os.path.dirname(__file__))
+# psutil lets us scan process command lines in-process instead of spawning pgrep
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# App root (three levels up from this file) and the files shared with the focus session
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+STOP_SIGNAL_FILE = os.path.join(SCRIPT_DIR, 'stop_signal')
+# Bound by focus_launcher's ProgressPopup while a session is active
+SESSION_SOCKET_PATH = os.path.join(SCRIPT_DIR, 'session.sock')
+# PID of the focus session last launched by start_mode
+FOCUS_PID_FILE = os.path.join(SCRIPT_DIR, 'focus.pid')
+CURRENT_MODE_FILE = os.path.join(SCRIPT_DIR, 'current_mode')
+FOCUSMODE_PATH = os.path.join(SCRIPT_DIR, 'focusmode.py')
+
+# Debug output is off unless FOCUS_DEBUG is set; %-style arguments mean the
+# messages aren't even formatted otherwise
+logger = logging.getLogger(__name__)
+if os.environ.get('FOCUS_DEBUG'):
+    logging.basicConfig(format='DEBUG: %(message)s')
+    logger.setLevel(logging.DEBUG)
 
 # Simple end session function that works without complex imports
 def end_session_event():
     """End the current session"""
     try:
-        print("DEBUG: end_session_event called")
-        # Create a stop signal file that the focus session will check for
-        script_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        stop_signal_file = os.path.join(script_dir, 'stop_signal')
-        
-        print(f"DEBUG: Creating stop signal file at: {stop_signal_file}")
-        # Create the stop signal file
-        with open(stop_signal_file, 'w') as f:
-            f.write('stop')
-        
-        # Wait a moment to ensure the signal is processed
-        import time
-        time.sleep(0.5)  # Half second delay
+        logger.debug("end_session_event called")
+        # One datagram to the session's control socket; it wakes on arrival
+        logger.debug("Sending stop to session socket at: %s", SESSION_SOCKET_PATH)
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+                sock.sendto(b'stop', SESSION_SOCKET_PATH)
+        except OSError:
+            # Session isn't listening yet (e.g. still starting up); fall back to
+            # the stop_signal file it polls once its timers are running
+            logger.debug("Session socket unavailable, writing stop signal file at: %s", STOP_SIGNAL_FILE)
+            tmp_file = STOP_SIGNAL_FILE + '.tmp'
+            # Rename is atomic, so the poll sees no file or the whole file; the
+            # signal is only read locally and deleted, so it needs no fsync
+            with open(tmp_file, 'wb') as f:
+                f.write(b'stop')
+            os.replace(tmp_file, STOP_SIGNAL_FILE)
         
         print("Session end signal sent successfully")
     except Exception as e:
@@ -34,42 +62,118 @@ def end_session_event():
 
 #open queued mode file, overwrite as blank.
 
+# Last process-scan result, reused briefly so button presses and the 100 ms
+# main loop don't each rescan the process table
+FOCUS_PROCESS_CHECK_TTL = 0.5  # seconds
+FOCUS_PROCESS_NAMES = ('focusmode', 'focus_launcher')
+_focus_process_cache = {'checked_at': None, 'running': False}
+
+def _focus_process_running():
+    """Check for a focusmode/focus_launcher process, reusing a result younger than the TTL"""
+    now = time.monotonic()
+    checked_at = _focus_process_cache['checked_at']
+    if checked_at is not None and now - checked_at < FOCUS_PROCESS_CHECK_TTL:
+        return _focus_process_cache['running']
+    
+    if psutil is not None:
+        running = False
+        for proc in psutil.process_iter(['cmdline']):
+            cmdline = ' '.join(proc.info['cmdline'] or ())
+            if any(name in cmdline for name in FOCUS_PROCESS_NAMES):
+                running = True
+                break
+    else:
+        result = subprocess.run(['pgrep', '-f', 'focusmode|focus_launcher'], 
+                              capture_output=True, text=True)
+        running = bool(result.stdout.strip())
+    _focus_process_cache['running'] = running
+    _focus_process_cache['checked_at'] = now
+    return _focus_process_cache['running']
+
+# PIDs of sessions we spawned; waitpid() on these also reaps exited children
+_launched_pids = set()
+
+def _focus_alive():
+    """Check the focus process, using the launched session's PID when there is one"""
+    try:
+        with open(FOCUS_PID_FILE) as f:
+            pid = int(f.read())
+    except (OSError, ValueError):
+        return _focus_process_running()
+    
+    if pid in _launched_pids:
+        try:
+            alive = os.waitpid(pid, os.WNOHANG) == (0, 0)
+        except ChildProcessError:
+            alive = False
+    else:
+        try:
+            os.kill(pid, 0)
+            alive = True
+        except ProcessLookupError:
+            alive = False
+        except PermissionError:  # Exists but owned by someone else
+            alive = True
+    if alive:
+        return True
+    
+    # That session is gone; forget it and make sure no other focus process is running
+    _launched_pids.discard(pid)
+    try:
+        os.remove(FOCUS_PID_FILE)
+    except OSError:
+        pass
+    return _focus_process_running()
+
+def _session_socket_listening():
+    """Check whether a session has its control socket bound (connect fails otherwise)"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+        try:
+            sock.connect(SESSION_SOCKET_PATH)
+            return True
+        except OSError:  # No socket file, or nobody bound to it
+            return False
+
 def is_session_actually_running():
-    """Check if there's a real active session (both file and process)"""
-    script_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    current_mode_file = os.path.join(script_dir, 'current_mode')
+    """Check if there's a real active session (control socket, else both file and process)"""
+    session_listening = _session_socket_listening()
+    logger.debug("Session socket listening: %s", session_listening)
+    if session_listening:
+        return True
     
-    print(f"DEBUG: Checking for current_mode file at: {current_mode_file}")
-    print(f"DEBUG: File exists: {os.path.exists(current_mode_file)}")
+    current_mode_file = CURRENT_MODE_FILE
+    current_mode_exists = os.path.exists(current_mode_file)
+    logger.debug("Checking for current_mode file at: %s", current_mode_file)
+    logger.debug("File exists: %s", current_mode_exists)
     
     # Check if there's actually a focus session process running
     focus_process_running = False
-    try:
-        result = subprocess.run(['pgrep', '-f', 'focusmode|focus_launcher'], 
-                              capture_output=True, text=True)
-        focus_process_running = bool(result.stdout.strip())
-        print(f"DEBUG: Focus process running: {focus_process_running}")
-    except:
-        pass
+    if current_mode_exists:
+        try:
+            focus_process_running = _focus_alive()
+            logger.debug("Focus process running: %s", focus_process_running)
+        except:
+            pass
     
     # Clean up leftover file if no process is running
-    if os.path.exists(current_mode_file) and not focus_process_running:
-        print("DEBUG: Leftover current_mode file found, cleaning up")
+    if current_mode_exists and not focus_process_running:
+        logger.debug("Leftover current_mode file found, cleaning up")
         try:
             os.remove(current_mode_file)
         except:
             pass
         return False
     
-    return os.path.exists(current_mode_file) and focus_process_running
+    return current_mode_exists and focus_process_running
+
+# Known identifiers for ESP boards, matched against port description and device
+ESP_PORT_PATTERN = re.compile(r'USB|wch|ESP|usbserial', re.IGNORECASE)
 
 def find_esp8266():
     """Find ESP8266 device port"""
-    ports = serial.tools.list_ports.comports()
-    for port in ports:
-        # Match by known identifiers for ESP boards
-        if ('USB' in port.description or 'wch' in port.description.lower() 
-            or 'ESP' in port.description or 'usbserial' in port.device):
+    search = ESP_PORT_PATTERN.search
+    for port in serial.tools.list_ports.comports():
+        if search(port.description) or search(port.device):
             return port.device
     return None
 
@@ -81,7 +185,6 @@ def connect_to_esp():
         
     try:
         # Close any existing connection first
-        import subprocess
         subprocess.run(['fuser', '-k', port], capture_output=True)
         
         ser = serial.Serial(port, 9600, timeout=1)
@@ -105,108 +208,126 @@ def is_esp_connected(ser):
         return False
 
 def handle_serial_communication(ser):
-    """Handle serial communication with error handling"""
+    """Read everything waiting on the port; return its button lines, or None on error"""
     try:
         if ser.in_waiting:
             # Wait a tiny bit to ensure complete message
-            import time
             time.sleep(0.01)
             
             # Read all available data
             raw_bytes = ser.read(ser.in_waiting)
-            print(f"DEBUG: Raw bytes received: {raw_bytes}")
+            logger.debug("Raw bytes received: %s", raw_bytes)
             
             # Decode and split by newlines
             try:
                 text = raw_bytes.decode('utf-8', errors='ignore')
                 lines = [line.strip() for line in text.split('\n') if line.strip()]
-                print(f"DEBUG: Decoded lines: {lines}")
+                logger.debug("Decoded lines: %s", lines)
                 
-                # Return the first valid line
-                for line in lines:
-                    if line in ['button1', 'button2']:
-                        return line
+                # Return every valid line in the burst
+                return [line for line in lines if line in BUTTON_ACTIONS]
                         
             except Exception as decode_error:
-                print(f"DEBUG: Decode error: {decode_error}")
+                logger.debug("Decode error: %s", decode_error)
                 
     except Exception as e:
         print(f"Serial communication error: {e}")
         return None
-    return ""
+    return []
+
+# kqueue on macOS, epoll on Linux; watches the current connection's serial fd
+serial_selector = selectors.DefaultSelector()
+
+def wait_for_serial_data(ser, timeout):
+    """Block until the serial port has data to read or the timeout passes"""
+    try:
+        fd = ser.fileno()
+        key = serial_selector.get_map().get(fd)
+        if key is None or key.data is not ser:
+            # New connection: drop the old port's registration and watch this one
+            for old_key in list(serial_selector.get_map().values()):
+                serial_selector.unregister(old_key.fileobj)
+            serial_selector.register(fd, selectors.EVENT_READ, ser)
+        serial_selector.select(timeout)
+    except Exception:
+        # Port has no selectable fd (or just went away); fall back to a short sleep
+        time.sleep(0.1)
 
 # Global connection state
 ser = None
 last_connection_attempt = 0
 connection_retry_interval = 5  # seconds
+serial_wait_timeout = 1.0  # seconds; also the queued-mode check interval
+button_debounce_interval = 0.2  # seconds
+last_button_press = {}  # message -> time.monotonic() of its last accepted press
 
-queued_mode = None
-waiting_for_session_end = False
-session_end_start_time = None
+# Pending "wait for the session to end, then start mode" request (mode may be None).
+# Replaced as a whole so readers never see a half-updated mode/start-time pair.
+QueuedMode = namedtuple('QueuedMode', 'mode started_at')
+queued = None
 
 def set_queued_mode(mode):
-    global queued_mode, waiting_for_session_end, session_end_start_time
-    queued_mode = mode
-    waiting_for_session_end = True
-    import time
-    session_end_start_time = time.time()
-    print(f"DEBUG: Started waiting for session to end, will start {mode} mode after")
+    global queued
+    queued = QueuedMode(mode, time.monotonic())
+    logger.debug("Started waiting for session to end, will start %s mode after", mode)
 
 def get_queued_mode():
-    return queued_mode
+    q = queued
+    return q.mode if q is not None else None
 
 def check_and_start_queued_mode():
     """Check if we're waiting for a session to end and start queued mode if ready"""
-    global waiting_for_session_end, queued_mode, session_end_start_time
+    global queued
     
     # If we're not waiting for anything, just return
-    if not waiting_for_session_end:
+    q = queued
+    if q is None:
         return
     
     # Check if session has actually ended (no focus process running)
     try:
-        result = subprocess.run(['pgrep', '-f', 'focusmode|focus_launcher'], 
-                              capture_output=True, text=True)
-        focus_process_running = bool(result.stdout.strip())
+        focus_process_running = _focus_alive()
         
         if not focus_process_running:
             # Session has ended, wait a bit more for summary to be closed
-            import time
-            elapsed = time.time() - session_end_start_time
+            elapsed = time.monotonic() - q.started_at
             if elapsed > 3:  # Wait at least 3 seconds after session ended
-                if queued_mode:  # Only start if there's a queued mode
-                    print(f"DEBUG: Session ended, starting queued mode: {queued_mode}")
-                    mode_to_start = queued_mode
-                    start_mode(mode_to_start)
+                if q.mode:  # Only start if there's a queued mode
+                    logger.debug("Session ended, starting queued mode: %s", q.mode)
+                    start_mode(q.mode)
                 else:
-                    print("DEBUG: Session ended, no queued mode to start")
+                    logger.debug("Session ended, no queued mode to start")
                 
                 # Reset state regardless of whether we had a queued mode
-                queued_mode = None
-                waiting_for_session_end = False
-                session_end_start_time = None
+                queued = None
     except:
         pass
 
 def start_mode(mode):
     """Start focus mode using hybrid CLI (skips mode selection, shows other UI)"""
     try:
-        script_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        focusmode_path = os.path.join(script_dir, 'focusmode.py')
+        script_dir = SCRIPT_DIR
+        focusmode_path = FOCUSMODE_PATH
         
-        print(f"DEBUG: start_mode called for {mode}")
-        print(f"DEBUG: script_dir = {script_dir}")
-        print(f"DEBUG: focusmode_path = {focusmode_path}")
-        print(f"DEBUG: focusmode.py exists = {os.path.exists(focusmode_path)}")
+        logger.debug("start_mode called for %s", mode)
+        logger.debug("script_dir = %s", script_dir)
+        logger.debug("focusmode_path = %s", focusmode_path)
+        logger.debug("focusmode.py exists = %s", os.path.exists(focusmode_path))
         
         print(f"Starting {mode} mode in hybrid mode (with UI)...")
         # Use hybrid mode - shows duration picker and goals dialog
-        process = subprocess.Popen([sys.executable, focusmode_path, mode], 
-                        cwd=script_dir,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE)
+        # posix_spawn skips copying this process the way fork+exec does; it has no
+        # cwd option, so switch first (focus_launcher writes files relative to it).
+        # Output goes to /dev/null since nothing here reads it.
+        os.chdir(script_dir)
+        pid = os.posix_spawn(sys.executable, [sys.executable, focusmode_path, mode], os.environ,
+                             file_actions=[(os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0),
+                                           (os.POSIX_SPAWN_OPEN, 2, os.devnull, os.O_WRONLY, 0)])
+        _launched_pids.add(pid)
+        with open(FOCUS_PID_FILE, 'w') as f:
+            f.write(str(pid))
         
-        print(f"DEBUG: Process started with PID: {process.pid}")
+        logger.debug("Process started with PID: %s", pid)
         print(f"{mode.title()} mode started with UI dialogs")
     except Exception as e:
         print(f"Error starting {mode} mode: {e}")
@@ -215,35 +336,39 @@ def start_mode(mode):
 
 def end_session_only():
     """End current session without queueing another"""
-    global waiting_for_session_end, session_end_start_time
-    print("DEBUG: Ending session without queuing another mode")
+    global queued
+    logger.debug("Ending session without queuing another mode")
     end_session_event()
-    waiting_for_session_end = True  # Track that we're waiting for session to end
-    session_end_start_time = time.time()
-    # Note: queued_mode remains None
+    queued = QueuedMode(None, time.monotonic())  # Track that we're waiting for session to end
 
 def button_1_action():
     if is_session_actually_running():
-        print("DEBUG: Active session detected, ending current session")
+        logger.debug("Active session detected, ending current session")
         end_session_event()
         set_queued_mode("productivity")
     else:
-        print("DEBUG: No active session, starting productivity mode")
+        logger.debug("No active session, starting productivity mode")
         start_mode("productivity")
 
 def button_2_action():
     if is_session_actually_running():
-        print("DEBUG: Active session detected, ending current session")
+        logger.debug("Active session detected, ending current session")
         end_session_only()  # End without queueing another mode
     else:
-        print("DEBUG: No active session")
+        logger.debug("No active session")
+
+# Serial message -> button handler
+BUTTON_ACTIONS = {
+    'button1': button_1_action,
+    'button2': button_2_action,
+}
 
 # Main loop with continuous scanning and reconnection
 print("Control Surface Monitor starting...")
 print("Scanning for ESP8266 device...")
 
 while True:
-    current_time = time.time()
+    current_time = time.monotonic()
     
     # Check if we need to start a queued mode
     check_and_start_queued_mode()
@@ -269,22 +394,31 @@ while True:
     
     # Handle button signals if connected
     if is_esp_connected(ser):
-        line = handle_serial_communication(ser)
+        lines = handle_serial_communication(ser)
         
-        if line is None:  # Communication error occurred
+        if lines is None:  # Communication error occurred
             print("Communication lost, will attempt reconnection...")
             try:
                 ser.close()
             except:
                 pass
             ser = None
-        elif line and line.strip():  # Received valid non-empty data
-            print(f"Received: {line}")
-            if line == "button1":
-                button_1_action()
-            elif line == "button2":
-                button_2_action()
+        else:
+            for line in lines:
+                # Ignore switch bounce / repeats of the same button in quick succession
+                press_time = time.monotonic()
+                if press_time - last_button_press.get(line, float('-inf')) < button_debounce_interval:
+                    continue
+                last_button_press[line] = press_time
+                print(f"Received: {line}")
+                action = BUTTON_ACTIONS.get(line)
+                if action is not None:
+                    action()
     
-    # Small delay to prevent excessive CPU usage
-    time.sleep(0.1 if is_esp_connected(ser) else 1.0)  # Longer delay when disconnected
+    # Sleep in the kernel until the ESP sends something, waking at least once
+    # a second to check the queued mode
+    if is_esp_connected(ser):
+        wait_for_serial_data(ser, serial_wait_timeout)
+    else:
+        time.sleep(1.0)
 
@@ -1,23 +1,155 @@
 #!/usr/bin/env python3
 
 import os
-import sys
+import re
 import json
-import imaplib
-import email
-import requests
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 from PyQt5.QtCore import QTimer, QObject, pyqtSignal, QThread, pyqtSignal as Signal, Qt
-from PyQt5.QtWidgets import QMessageBox, QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QLineEdit, QTextEdit, QCheckBox, QComboBox, QWidget
+from PyQt5.QtWidgets import QMessageBox, QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QLineEdit, QTextEdit, QCheckBox, QComboBox, QWidget, QListWidget, QListWidgetItem
 from PyQt5.QtGui import QPixmap, QIcon
 
-# Add parent directory to path to import plugin_system
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from plugin_system import PluginBase
 
+# Debug lines are skipped, arguments unformatted, unless FOCUS_DEBUG is set
+logger = logging.getLogger(__name__)
+if os.environ.get('FOCUS_DEBUG'):
+    logging.basicConfig(format='DEBUG: %(message)s')
+    logger.setLevel(logging.DEBUG)
+
+# Headers used for analysis, bulk-mail detection and body decoding, plus the first 8 KB of
+# the body (enough for the 2000 characters kept once MIME boundaries and encoding are stripped)
+EMAIL_FETCH_ITEMS = '(BODY.PEEK[HEADER.FIELDS (SUBJECT FROM DATE LIST-UNSUBSCRIBE PRECEDENCE CONTENT-TYPE CONTENT-TRANSFER-ENCODING MIME-VERSION)] BODY.PEEK[TEXT]<0.8192>)'
+
+# Sender substrings of automated mail that never becomes a task; excluded in the IMAP
+# SEARCH and checked again client-side for servers that reject the longer query
+AUTOMATED_SENDERS = ('noreply', 'no-reply', 'donotreply', 'notification', 'automated', 'system', 'alert', 'marketing')
+_AUTOMATED_SENDER_RE = re.compile('|'.join(map(re.escape, AUTOMATED_SENDERS)), re.IGNORECASE)
+
+# Subjects that only promotions and newsletters use; kept narrow so real mail isn't dropped
+_PROMO_SUBJECT_RE = re.compile(r'\d+\s*% off|limited[- ]time|newsletter|promo(?:tion(?:al)?)? code|flash sale|mailer-daemon', re.IGNORECASE)
+
+# Fallback importance keywords, matched as substrings anywhere in the subject or body
+_URGENT_KEYWORDS_RE = re.compile('urgent|asap|deadline|due|important|critical', re.IGNORECASE)
+_ACTION_KEYWORDS_RE = re.compile('please|can you|review|approve|complete|need you to', re.IGNORECASE)
+
+# Groq verdicts are reused for identical emails (e.g. the 4-hour window re-read at every
+# session start) for this long, keeping at most this many
+GROQ_CACHE_TTL = 30 * 60  # seconds
+GROQ_CACHE_SIZE = 256
+
+# Style for email tasks added to the session checklist
+EMAIL_TASK_CHECKBOX_STYLE = """
+    QCheckBox {
+        font-size: 14px;
+        color: #4a4a4a;
+        spacing: 12px;
+        padding: 8px 0px;
+        font-weight: 500;
+        line-height: 1.4;
+        margin-bottom: 2px;
+    }
+    QCheckBox::indicator {
+        width: 18px;
+        height: 18px;
+        border-radius: 9px;
+        border: 2px solid #d1d1d6;
+        background-color: white;
+    }
+    QCheckBox::indicator:checked {
+        background-color: #007aff;
+        border-color: #007aff;
+        image: url(data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMTIiIGhlaWdodD0iMTIiIHZpZXdCb3g9IjAgMCAxMiAxMiIgZmlsbD0ibm9uZSIgeG1sbnM9Imh0dHA6Ly93d3cudzMub3JnLzIwMDAvc3ZnIj4KPHBhdGggZD0iTTEwIDNMNC41IDguNUwyIDYiIHN0cm9rZT0id2hpdGUiIHN0cm9rZS13aWR0aD0iMiIgc3Ryb2tlLWxpbmVjYXA9InJvdW5kIiBzdHJva2UtbGluZWpvaW49InJvdW5kIi8+Cjwvc3ZnPgo=);
+    }
+"""
+
+# Keychain service the IMAP password is stored under when keyring is installed
+KEYRING_SERVICE = 'focus_utility'
+
+# Checks only look at the 10 newest emails, so this just bounds memory over long runs
+MAX_PROCESSED_EMAILS = 4096
+
+# (pattern, replacement) pairs applied in order by Plugin.clean_email_body, compiled once
+_CLEAN_SUBS = [
+    # Token-level removals, combined into one alternation so the body is scanned once.
+    # Same result as applying them one after the other, except that text on either
+    # side of a removed HTML tag is no longer re-scanned as a cid/=XX artifact.
+    (re.compile('|'.join([
+        # URLs (http/https links)
+        r'(?i:https?://[^\s<>"\']+)',
+        # Email tracking links and UTM parameters
+        r'(?i:[^\s]*\.(?:com|net|org|edu|gov|io|co)/[^\s<>"\']*)',
+        # HubSpot and other tracking links
+        r'(?i:[^\s]*hubspotlinks[^\s<>"\']*)',
+        r'(?i:[^\s]*\.eu1\.[^\s<>"\']*)',
+        # Microsoft Office embedded codes
+        r'<[^>]*>',  # HTML tags
+        r'\[cid:[^\]]*\]',  # Content-ID references
+        r'=\w{2}',  # Quoted-printable encoding artifacts
+    ])), ''),
+    
+    # Remove common email signature patterns
+    (re.compile(r'--+\s*\n.*', re.DOTALL), ''),  # Signature separator
+    (re.compile(r'Sent from my \w+.*\n?', re.IGNORECASE), ''),
+    
+    # Remove unsubscribe and footer links
+    (re.compile(r'unsubscribe.*\n?', re.IGNORECASE), ''),
+    (re.compile(r'this email was sent.*\n?', re.IGNORECASE), ''),
+    (re.compile(r'view.*in.*browser.*\n?', re.IGNORECASE), ''),
+    
+    # Remove excessive whitespace and empty lines
+    (re.compile(r'\n\s*\n\s*\n'), '\n\n'),  # Multiple empty lines to double
+    (re.compile(r'[ \t]+'), ' '),  # Multiple spaces to single
+    
+    # Remove common marketing/tracking text patterns
+    (re.compile(r'pixel.*tracking', re.IGNORECASE), ''),
+    (re.compile(r'open.*rate', re.IGNORECASE), ''),
+    (re.compile(r'click.*through', re.IGNORECASE), ''),
+    (re.compile(r'campaign.*id', re.IGNORECASE), ''),
+    (re.compile(r'utm_[a-z]+=[^\s&]*', re.IGNORECASE), ''),
+    (re.compile(r'track.*click', re.IGNORECASE), ''),
+    (re.compile(r'email.*analytics', re.IGNORECASE), ''),
+]
+
+class ConnectionTestWorker(QThread):
+    """Background thread for the IMAP connection test to prevent UI freezing"""
+    test_finished = pyqtSignal(str)  # error message, empty on success
+    
+    def __init__(self, server, email_addr, password):
+        super().__init__()
+        self.server = server
+        self.email_addr = email_addr
+        self.password = password
+    
+    def run(self):
+        """Connect, log in and select the inbox, then log out"""
+        import imaplib
+        
+        try:
+            mail = imaplib.IMAP4_SSL(self.server, 993)  # Explicitly specify port
+            print(f"SSL connection established to {self.server}")
+            
+            login_result = mail.login(self.email_addr, self.password)
+            print(f"Login result: {login_result}")
+            
+            select_result = mail.select('inbox')
+            print(f"Inbox select result: {select_result}")
+            
+            mail.logout()
+            print("Connection test successful")
+            self.test_finished.emit("")
+        except Exception as e:
+            self.test_finished.emit(str(e) or type(e).__name__)
 
 class EmailConfigDialog(QDialog):
+    # Connection tests still running, kept alive past the dialog that started them
+    _running_tests = set()
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.email_config = {}
@@ -111,6 +243,7 @@ class EmailConfigDialog(QDialog):
         
         test_btn = QPushButton("Test Connection")
         test_btn.clicked.connect(self.test_connection)
+        self.test_btn = test_btn
         
         save_btn = QPushButton("Save")
         save_btn.clicked.connect(self.save_config)
@@ -166,24 +299,27 @@ class EmailConfigDialog(QDialog):
         else:
             server = self.email_providers[provider]['server']
         
-        try:
-            # Test IMAP connection with detailed error reporting
-            print(f"Testing connection to {provider} ({server}) for {email_addr}")
-            mail = imaplib.IMAP4_SSL(server, 993)  # Explicitly specify port
-            print(f"SSL connection established to {server}")
-            
-            login_result = mail.login(email_addr, password)
-            print(f"Login result: {login_result}")
-            
-            select_result = mail.select('inbox')
-            print(f"Inbox select result: {select_result}")
-            
-            mail.logout()
-            print("Connection test successful")
-            
+        # Test IMAP connection in the background with detailed error reporting
+        print(f"Testing connection to {provider} ({server}) for {email_addr}")
+        self.test_btn.setEnabled(False)
+        self.test_btn.setText("Testing...")
+        
+        worker = ConnectionTestWorker(server, email_addr, password)
+        worker.test_finished.connect(lambda error_msg: self.on_test_finished(provider, server, email_addr, error_msg))
+        worker.finished.connect(lambda: EmailConfigDialog._running_tests.discard(worker))
+        EmailConfigDialog._running_tests.add(worker)
+        worker.start()
+    
+    def on_test_finished(self, provider, server, email_addr, error_msg):
+        """Report the result of a background connection test"""
+        self.test_btn.setEnabled(True)
+        self.test_btn.setText("Test Connection")
+        if not self.isVisible():
+            return  # Dialog was closed while the test ran
+        
+        if not error_msg:
             QMessageBox.information(self, "Success", f"Successfully connected to {provider}!\nEmail: {email_addr}")
-        except Exception as e:
-            error_msg = str(e)
+        else:
             print(f"Connection error: {error_msg}")
             
             if "authentication failed" in error_msg.lower() or "login failed" in error_msg.lower():
@@ -453,15 +589,16 @@ class EmailTaskDialog(QDialog):
         title.setStyleSheet("font-size: 16px; font-weight: bold; margin-bottom: 10px;")
         layout.addWidget(title)
         
-        # Email list
-        self.checkboxes = []
+        # Email list: checkable items in one scrolling list rather than a widget per email
+        self.email_list = QListWidget()
+        self.email_list.setStyleSheet("QListWidget::item { margin: 5px 0px; }")
         for email_summary in self.email_summaries:
-            checkbox = QCheckBox()
-            checkbox.setChecked(True)  # Default to checked
-            checkbox.setText(f"From: {email_summary['from']} - {email_summary['task']}")
-            checkbox.setStyleSheet("margin: 5px 0px;")
-            layout.addWidget(checkbox)
-            self.checkboxes.append((checkbox, email_summary))
+            item = QListWidgetItem(f"From: {email_summary['from']} - {email_summary['task']}")
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked)  # Default to checked
+            item.setData(Qt.UserRole, email_summary)
+            self.email_list.addItem(item)
+        layout.addWidget(self.email_list)
         
         # Buttons
         button_layout = QHBoxLayout()
@@ -482,15 +619,56 @@ class EmailTaskDialog(QDialog):
     def add_selected(self):
         """Add selected email tasks"""
         self.selected_tasks = []
-        for checkbox, email_summary in self.checkboxes:
-            if checkbox.isChecked():
-                self.selected_tasks.append(email_summary['task'])
+        for row in range(self.email_list.count()):
+            item = self.email_list.item(row)
+            if item.checkState() == Qt.Checked:
+                self.selected_tasks.append(item.data(Qt.UserRole)['task'])
         self.accept()
 
 class EmailSignalEmitter(QObject):
     """Separate signal emitter to avoid metaclass conflicts"""
     email_notification = pyqtSignal(str, str)  # title, message
 
+class EmailCheckWorker(QThread):
+    """Background thread for IMAP fetching and email analysis to prevent UI freezing"""
+    emails_ready = pyqtSignal(list)  # [(email_id, email_data, task)] for emails not yet processed
+    error_occurred = pyqtSignal(str)  # error message
+    
+    def __init__(self, plugin, processed_emails):
+        super().__init__()
+        self.plugin = plugin
+        self.processed_emails = processed_emails
+    
+    def run(self):
+        """Fetch the last 10 minutes of email and analyze the ones not seen before"""
+        try:
+            # Keeps the GUI thread (on_goals_analyzed) off the IMAP connection and caches meanwhile
+            with self.plugin._io_lock:
+                # Check for emails from the last 10 minutes that arrived since the last check
+                recent_emails = self.plugin.get_recent_emails(hours=0.17, new_only=True)  # 10 minutes (10/60 = 0.17)
+                logger.debug("Found %s recent emails", len(recent_emails))
+                
+                new_emails = []
+                for email_data in recent_emails:
+                    # Create unique identifier for this email
+                    email_id = self.plugin.email_id(email_data)
+                    
+                    # Skip if we've already processed this email
+                    if email_id in self.processed_emails:
+                        logger.debug("Skipping already processed email: %s", email_data['subject'][:50])
+                        continue
+                    
+                    logger.debug("Analyzing new email #%s: %s", len(new_emails) + 1, email_data['subject'][:50])
+                    logger.debug("From: %s", email_data['from'])
+                    new_emails.append((email_id, email_data))
+                
+                tasks = self.plugin.analyze_email_importance_batch([email_data for _, email_data in new_emails])
+                self.emails_ready.emit([(email_id, email_data, task) for (email_id, email_data), task in zip(new_emails, tasks)])
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            self.error_occurred.emit(str(e))
+
 class Plugin(PluginBase):
     """Email Assistant Plugin - Analyzes emails and suggests tasks"""
     
@@ -505,20 +683,49 @@ class Plugin(PluginBase):
         
         self.email_config = {}
         self.config_file = os.path.join(os.path.dirname(__file__), 'email_config.json')
+        self._config_mtime_ns = None  # mtime of the config file email_config was read from
+        self._groq_key_file = None  # (mtime, key) of groq_api_key.txt as last read
         self.monitoring_thread = None
         self.should_monitor = False
         self.session_active = False
         
-        # Track processed emails to avoid duplicate notifications
-        self.processed_emails = set()  # Track by subject + from combination
+        # Track processed emails to avoid duplicate notifications, oldest first
+        self.processed_emails = OrderedDict()  # Track by subject + from combination
         
         # Reference to current email dialog to prevent garbage collection
         self.current_email_dialog = None
         
+        # Background email check in flight, if any
+        self._email_worker = None
+        
+        # Logged-in IMAP connection (inbox selected) reused across checks, and the
+        # (server, email) it belongs to
+        self._imap = None
+        self._imap_key = None
+        
+        # Highest inbox UID already returned, so periodic checks only ask for newer
+        # mail; only valid for the (server, email, UIDVALIDITY) it was read under
+        self._last_uid = None
+        self._uid_scope = None
+        
+        # HTTP session for Groq calls, created on first use; keeps the TLS connection alive
+        self._http = None
+        
+        # Content hash -> (time.monotonic() stored, task or "NO_ACTION"), oldest first
+        self._groq_cache = OrderedDict()
+        
+        # Held while fetching and analyzing: the IMAP connection, UID watermark, Groq cache
+        # and HTTP session are shared by the check worker and on_goals_analyzed
+        self._io_lock = threading.Lock()
+        
         # Timer for periodic email checks during session
         self.email_timer = QTimer()
         self.email_timer.timeout.connect(self.check_new_emails)
         self.email_timer.setSingleShot(False)  # Ensure it repeats
+        
+        # Timer that restarts the email timer if it stops unexpectedly during a session
+        self.health_timer = QTimer()
+        self.health_timer.timeout.connect(self._health_check)
     
     def initialize(self) -> bool:
         """Initialize the email plugin"""
@@ -545,105 +752,259 @@ class Plugin(PluginBase):
             print(f"Email configuration saved: {provider} account for {email}")
     
     def load_config(self):
-        """Load email configuration from file"""
+        """Load email configuration from file, skipping the read if it hasn't changed"""
         try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    self.email_config = json.load(f)
+            try:
+                mtime_ns = os.stat(self.config_file).st_mtime_ns
+            except FileNotFoundError:
+                return
+            if mtime_ns == self._config_mtime_ns:
+                return
+            with open(self.config_file, 'r') as f:
+                self.email_config = json.loads(f.read())
+            self._config_mtime_ns = mtime_ns
         except Exception as e:
             print(f"Error loading email config: {e}")
             self.email_config = {}
+            self._config_mtime_ns = None
+            return
+        
+        if 'password' in self.email_config:
+            # Written before the keychain was used (or without keyring); move it there
+            if self._keyring_set_password(self.email_config['password']):
+                self.save_config()
+        elif self.email_config.get('email'):
+            password = self._keyring_get_password()
+            if password is not None:
+                self.email_config['password'] = password
     
     def save_config(self):
-        """Save email configuration to file"""
+        """Save email configuration to file, keeping the password in the keychain when possible"""
         try:
+            file_config = self.email_config
+            if 'password' in file_config and self._keyring_set_password(file_config['password']):
+                file_config = {key: value for key, value in file_config.items() if key != 'password'}
             with open(self.config_file, 'w') as f:
-                json.dump(self.email_config, f, indent=2)
+                json.dump(file_config, f, indent=2)
+            # What we just wrote is already in memory
+            self._config_mtime_ns = os.stat(self.config_file).st_mtime_ns
         except Exception as e:
             print(f"Error saving email config: {e}")
     
-    def get_recent_emails(self, hours=2) -> List[Dict[str, Any]]:
-        """Get recent emails from the last N hours"""
+    def _keyring_username(self) -> str:
+        """Keychain account name for the configured email address"""
+        return f"{self.name}:{self.email_config.get('email', '')}"
+    
+    def _keyring_set_password(self, password: str) -> bool:
+        """Store the IMAP password in the system keychain; False if keyring is unavailable"""
+        try:
+            import keyring
+            keyring.set_password(KEYRING_SERVICE, self._keyring_username(), password)
+            return True
+        except ImportError:
+            return False
+        except Exception as e:
+            print(f"Could not store email password in keychain: {e}")
+            return False
+    
+    def _keyring_get_password(self) -> Optional[str]:
+        """Read the IMAP password from the system keychain, or None"""
+        try:
+            import keyring
+            return keyring.get_password(KEYRING_SERVICE, self._keyring_username())
+        except ImportError:
+            return None
+        except Exception as e:
+            print(f"Could not read email password from keychain: {e}")
+            return None
+    
+    def _get_imap(self):
+        """Return the cached IMAP connection, reconnecting if it dropped or the account changed"""
+        import imaplib
+        
+        server = self.email_config['server']
+        email_addr = self.email_config['email']
+        key = (server, email_addr)
+        
+        if self._imap is not None and self._imap_key == key:
+            try:
+                self._imap.noop()  # Cheap liveness check; also refreshes the mailbox
+                return self._imap
+            except Exception as e:
+                print(f"Cached IMAP connection lost ({e}), reconnecting")
+        self._close_imap()
+        
+        print(f"Connecting to {server} for {email_addr}")
+        mail = imaplib.IMAP4_SSL(server, 993)
+        print("SSL connection established")
+        
+        # IMAP login with password/app password
+        login_result = mail.login(email_addr, self.email_config['password'])
+        print(f"Login successful: {login_result}")
+        
+        select_result = mail.select('inbox')
+        print(f"Inbox selected: {select_result}")
+        
+        # UIDs only carry over between connections while UIDVALIDITY is unchanged
+        uid_scope = (key, mail.response('UIDVALIDITY')[1][0])
+        if uid_scope != self._uid_scope:
+            self._uid_scope = uid_scope
+            self._last_uid = None
+        
+        self._imap = mail
+        self._imap_key = key
+        return mail
+    
+    def _close_imap(self):
+        """Log out of and forget the cached IMAP connection"""
+        mail, self._imap, self._imap_key = self._imap, None, None
+        if mail is not None:
+            try:
+                mail.logout()
+            except Exception:
+                pass
+    
+    def _close_http(self):
+        """Close and forget the Groq HTTP session; the next request opens a new one"""
+        http, self._http = self._http, None
+        if http is not None:
+            http.close()
+    
+    def email_id(self, email_data: Dict[str, Any]) -> bytes:
+        """Fixed-size identifier for an email, built from its sender, subject and date"""
+        key = f"{email_data['from']}\x1f{email_data['subject']}\x1f{email_data.get('date', '')}"
+        return hashlib.blake2b(key.encode('utf-8', errors='ignore'), digest_size=16).digest()
+    
+    def mark_email_processed(self, email_id: bytes):
+        """Remember an email as handled, forgetting the least recently seen past the cap"""
+        self.processed_emails[email_id] = None
+        self.processed_emails.move_to_end(email_id)
+        if len(self.processed_emails) > MAX_PROCESSED_EMAILS:
+            self.processed_emails.popitem(last=False)
+    
+    def get_recent_emails(self, hours=2, new_only=False) -> List[Dict[str, Any]]:
+        """Get recent emails from the last N hours; with new_only, only ones not returned before"""
         if not self.email_config:
             print("No email config available")
             return []
         
+        # Deferred so users who never configure email don't pay for these imports
+        import email
+        import imaplib
+        
         try:
-            server = self.email_config['server']
-            email_addr = self.email_config['email']
-            password = self.email_config['password']
-            
-            print(f"Connecting to {server} for {email_addr}")
-            mail = imaplib.IMAP4_SSL(server, 993)
-            print("SSL connection established")
-            
-            # IMAP login with password/app password
-            login_result = mail.login(email_addr, password)
-            print(f"Login successful: {login_result}")
-            
-            select_result = mail.select('inbox')
-            print(f"Inbox selected: {select_result}")
+            mail = self._get_imap()
             
             # Search for emails from the last N hours
             since_date = (datetime.now() - timedelta(hours=hours)).strftime('%d-%b-%Y')
             print(f"Searching for emails since: {since_date}")
-            result, messages = mail.search(None, f'(SINCE "{since_date}")')
+            criteria = f'SINCE "{since_date}"'
+            last_uid = self._last_uid if new_only else None
+            if last_uid is not None:
+                criteria = f'UID {last_uid + 1}:* {criteria}'
+            exclude_automated = ' '.join(f'NOT FROM "{sender}"' for sender in AUTOMATED_SENDERS)
+            try:
+                result, messages = mail.uid('SEARCH', None, f'({criteria} {exclude_automated})')
+            except imaplib.IMAP4.abort:
+                raise
+            except imaplib.IMAP4.error as search_error:
+                result, messages = 'NO', [str(search_error)]
+            if result != 'OK':
+                print(f"Filtered search rejected ({messages}), searching by date only")
+                result, messages = mail.uid('SEARCH', None, f'({criteria})')
             
             emails = []
+            # Only recorded once the FETCH succeeds, so a failed one is retried next poll
+            new_last_uid = self._last_uid
             if result == 'OK':
                 message_ids = messages[0].split() if messages[0] else []
+                if message_ids:
+                    new_last_uid = max(self._last_uid or 0, max(int(uid) for uid in message_ids))
+                if last_uid is not None:
+                    # "n:*" always matches the newest message, even when its UID is below n
+                    message_ids = [uid for uid in message_ids if int(uid) > last_uid]
                 print(f"Found {len(message_ids)} recent emails")
                 
-                # Get the last 10 emails maximum
-                for msg_id in message_ids[-10:]:
+                # Get the last 10 emails maximum, in a single FETCH round trip. Only the
+                # headers we read and the start of the body are transferred (attachments
+                # never are); PEEK leaves the messages unread.
+                recent_ids = message_ids[-10:]
+                msg_data = []
+                if recent_ids:
+                    result, msg_data = mail.uid('FETCH', b','.join(recent_ids), EMAIL_FETCH_ITEMS)
+                    if result != 'OK':
+                        print(f"Email fetch failed: {result}")
+                        return []
+                
+                # Each message arrives as a header literal and a body literal followed by
+                # b')'; a new message's envelope starts with its sequence number
+                raw_messages = []
+                for part in msg_data:
+                    if not isinstance(part, tuple) or len(part) < 2:
+                        continue
+                    envelope, literal = part[0], part[1]
+                    if envelope[:1].isdigit():
+                        raw_messages.append({})
+                    if raw_messages:
+                        key = 'header' if b'HEADER' in envelope.upper() else 'text'
+                        raw_messages[-1][key] = literal or b''
+                
+                for raw in raw_messages:
                     try:
-                        result, msg_data = mail.fetch(msg_id, '(RFC822)')
-                        if result == 'OK' and msg_data[0] and len(msg_data[0]) > 1:
-                            email_body = msg_data[0][1]
-                            email_message = email.message_from_bytes(email_body)
-                            
-                            # Extract email details
-                            subject = email_message['Subject'] or 'No Subject'
-                            from_addr = email_message['From'] or 'Unknown Sender'
-                            date_str = email_message['Date'] or ''
-                            
-                            # Get email body
-                            body = self.extract_email_body(email_message)
-                            
-                            emails.append({
-                                'subject': subject,
-                                'from': from_addr,
-                                'date': date_str,
-                                'body': body[:2000]  # Increased to 2000 chars for better content analysis
-                            })
-                            print(f"Processed email: {subject[:50]}...")
+                        # Headers end with a blank line, so header + text parses as one
+                        # (possibly truncated) message and multipart bodies still walk
+                        email_message = email.message_from_bytes(raw.get('header', b'') + raw.get('text', b''))
+                        
+                        # Extract email details
+                        subject = email_message['Subject'] or 'No Subject'
+                        from_addr = email_message['From'] or 'Unknown Sender'
+                        date_str = email_message['Date'] or ''
+                        # Mailing lists and bulk senders mark themselves in these headers
+                        bulk = (email_message['List-Unsubscribe'] is not None
+                                or (email_message['Precedence'] or '').strip().lower() in ('bulk', 'list', 'junk'))
+                        
+                        # Get email body
+                        body = self.extract_email_body(email_message)
+                        
+                        emails.append({
+                            'subject': subject,
+                            'from': from_addr,
+                            'date': date_str,
+                            'body': body[:2000],  # Increased to 2000 chars for better content analysis
+                            'bulk': bulk
+                        })
+                        print(f"Processed email: {subject[:50]}...")
                     except Exception as email_error:
                         print(f"Error processing individual email: {email_error}")
                         continue
             else:
                 print(f"Email search failed: {result}")
             
-            mail.logout()
             print(f"Successfully retrieved {len(emails)} emails")
+            self._last_uid = new_last_uid
             return emails
             
         except Exception as e:
             print(f"Error fetching emails: {e}")
+            # Don't reuse a connection that may be half-way through a command
+            self._close_imap()
             import traceback
             traceback.print_exc()
             return []
     
-    def extract_email_body(self, email_message) -> str:
-        """Extract the body text from an email message"""
+    def extract_email_body(self, email_message, max_bytes=8192) -> str:
+        """Extract the body text from an email message, decoding at most max_bytes"""
         try:
             raw_body = ""
             if email_message.is_multipart():
                 for part in email_message.walk():
+                    if part.get_content_disposition() == "attachment":
+                        continue  # A .txt attachment is not the message body
                     if part.get_content_type() == "text/plain":
-                        raw_body = part.get_payload(decode=True).decode('utf-8', errors='ignore')
+                        raw_body = part.get_payload(decode=True)[:max_bytes].decode('utf-8', errors='ignore')
                         break
             else:
-                raw_body = email_message.get_payload(decode=True).decode('utf-8', errors='ignore')
+                raw_body = email_message.get_payload(decode=True)[:max_bytes].decode('utf-8', errors='ignore')
             
             # Clean the extracted body text
             return self.clean_email_body(raw_body)
@@ -656,66 +1017,27 @@ class Plugin(PluginBase):
         if not body_text:
             return ""
         
-        import re
-        
-        # Remove URLs (http/https links)
-        body_text = re.sub(r'https?://[^\s<>"\']+', '', body_text, flags=re.IGNORECASE)
-        
-        # Remove email tracking links and UTM parameters
-        body_text = re.sub(r'[^\s]*\.(com|net|org|edu|gov|io|co)/[^\s<>"\']*', '', body_text, flags=re.IGNORECASE)
-        
-        # Remove HubSpot and other tracking links
-        body_text = re.sub(r'[^\s]*hubspotlinks[^\s<>"\']*', '', body_text, flags=re.IGNORECASE)
-        body_text = re.sub(r'[^\s]*\.eu1\.[^\s<>"\']*', '', body_text, flags=re.IGNORECASE)
-        
-        # Remove Microsoft Office embedded codes
-        body_text = re.sub(r'<[^>]*>', '', body_text)  # HTML tags
-        body_text = re.sub(r'\[cid:[^\]]*\]', '', body_text)  # Content-ID references
-        body_text = re.sub(r'=\w{2}', '', body_text)  # Quoted-printable encoding artifacts
-        
-        # Remove common email signature patterns
-        body_text = re.sub(r'--+\s*\n.*', '', body_text, flags=re.DOTALL)  # Signature separator
-        body_text = re.sub(r'Sent from my \w+.*\n?', '', body_text, flags=re.IGNORECASE)
-        
-        # Remove unsubscribe and footer links
-        body_text = re.sub(r'unsubscribe.*\n?', '', body_text, flags=re.IGNORECASE)
-        body_text = re.sub(r'this email was sent.*\n?', '', body_text, flags=re.IGNORECASE)
-        body_text = re.sub(r'view.*in.*browser.*\n?', '', body_text, flags=re.IGNORECASE)
-        
-        # Remove excessive whitespace and empty lines
-        body_text = re.sub(r'\n\s*\n\s*\n', '\n\n', body_text)  # Multiple empty lines to double
-        body_text = re.sub(r'[ \t]+', ' ', body_text)  # Multiple spaces to single
-        
-        # Remove common marketing/tracking text patterns
-        tracking_patterns = [
-            r'pixel.*tracking',
-            r'open.*rate',
-            r'click.*through',
-            r'campaign.*id',
-            r'utm_[a-z]+=[^\s&]*',
-            r'track.*click',
-            r'email.*analytics',
-        ]
-        
-        for pattern in tracking_patterns:
-            body_text = re.sub(pattern, '', body_text, flags=re.IGNORECASE)
+        for pattern, replacement in _CLEAN_SUBS:
+            body_text = pattern.sub(replacement, body_text)
         
         # Clean up and return
         return body_text.strip()
     
+    def is_automated_email(self, email_data: Dict[str, Any]) -> bool:
+        """Whether an email is automated or bulk mail that never needs the AI's opinion"""
+        return (_AUTOMATED_SENDER_RE.search(email_data['from']) is not None
+                or email_data.get('bulk', False)
+                or _PROMO_SUBJECT_RE.search(email_data['subject']) is not None)
+    
     def analyze_email_importance(self, email_data: Dict[str, Any]) -> Optional[str]:
         """Analyze if an email is important and extract a task using Groq AI"""
-        print(f"DEBUG: Analyzing email from {email_data['from']}")
-        print(f"DEBUG: Subject: {email_data['subject']}")
-        print(f"DEBUG: Body preview: {email_data['body'][:100]}...")
+        logger.debug("Analyzing email from %s", email_data['from'])
+        logger.debug("Subject: %s", email_data['subject'])
+        logger.debug("Body preview: %s...", email_data['body'][:100])
         
         # Quick filter for obviously automated emails
-        from_addr = email_data['from'].lower()
-        automated_senders = ['noreply', 'no-reply', 'donotreply', 'notification', 'automated', 'system', 'alert', 'marketing']
-        is_automated = any(sender in from_addr for sender in automated_senders)
-        
-        if is_automated:
-            print(f"DEBUG: Skipping automated email from {email_data['from']}")
+        if self.is_automated_email(email_data):
+            logger.debug("Skipping automated email from %s", email_data['from'])
             return None
         
         # Use Groq AI to analyze the email
@@ -723,16 +1045,142 @@ class Plugin(PluginBase):
 
         groq_analysis = self.analyze_email_with_groq(email_data)
         if groq_analysis and groq_analysis != "NO_ACTION":
-            print(f"DEBUG: Groq AI analysis result: {groq_analysis}")
+            logger.debug("Groq AI analysis result: %s", groq_analysis)
             return groq_analysis
         
         if not groq_analysis:
             # Fallback to simplified keyword-based analysis if Groq fails
-            print("DEBUG: Groq AI analysis failed, using fallback")
+            logger.debug("Groq AI analysis failed, using fallback")
             return self.fallback_email_analysis(email_data)
     
+    def analyze_email_importance_batch(self, emails: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """Analyze several emails with one Groq request; same per-email results as analyze_email_importance"""
+        results = [None] * len(emails)
+        
+        # Automated senders are skipped without asking the AI
+        pending = []
+        for index, email_data in enumerate(emails):
+            if self.is_automated_email(email_data):
+                logger.debug("Skipping automated email from %s", email_data['from'])
+            else:
+                pending.append(index)
+        
+        # Emails Groq has already judged don't need to be sent again
+        uncached = []
+        for index in pending:
+            cached = self._cached_groq_result(emails[index])
+            if cached is not None:
+                logger.debug("Using cached Groq analysis for: %s", emails[index]['subject'][:50])
+                results[index] = cached
+            else:
+                uncached.append(index)
+        pending = uncached
+        if not pending:
+            return results
+        
+        answers = self.analyze_emails_with_groq([emails[index] for index in pending]) if len(pending) > 1 else None
+        if answers is None:
+            # Single email, no API key, or an unusable batch reply: analyze one at a time
+            for index in pending:
+                results[index] = self.analyze_email_importance(emails[index])
+            return results
+        
+        for index, answer in zip(pending, answers):
+            task = self._parse_groq_task(answer) if isinstance(answer, str) else None
+            if task:
+                self._store_groq_result(emails[index], task)
+            else:
+                # Fallback to simplified keyword-based analysis for this email
+                task = self.fallback_email_analysis(emails[index])
+            results[index] = task
+        return results
+    
+    def analyze_emails_with_groq(self, emails: List[Dict[str, Any]]) -> Optional[List[Any]]:
+        """Ask Groq about several emails at once; return its per-email answers, or None on failure"""
+        try:
+            groq_key = self.load_groq_api_key()
+            if not groq_key:
+                print("No Groq API key found for email analysis")
+                return None
+            
+            email_blocks = []
+            for number, email_data in enumerate(emails, 1):
+                email_blocks.append(f"""[{number}]
+Email from: {self.extract_sender_name(email_data['from'])}
+Subject: {email_data['subject']}
+Body: {email_data['body'][:1500]}""")
+            
+            prompt = f"""Analyze each of these {len(emails)} emails and determine if it requires action. For each one that does, extract a specific, actionable task.
+
+""" + "\n\n".join(email_blocks) + f"""
+
+Instructions:
+1. For each email, first determine if it requires any action from the recipient
+2. If NO action is needed, its answer is exactly: "NO_ACTION"
+3. If action IS needed, its answer is a single, specific task starting with an action verb
+4. Make each task clear and concise (under 100 characters)
+5. Include relevant deadlines or context if mentioned
+6. If an email falls under spam, marketing (such as anything mentioning discounts or sales, or anything reccomending a purchase), or automated notifications, its answer is "NO_ACTION"
+
+Respond with only a JSON object whose "answers" array holds {len(emails)} strings, one answer per email in the order given, for example:
+{{"answers": ["Review the quarterly budget proposal and provide feedback by Friday", "NO_ACTION"]}}
+
+Response:"""
+            
+            print(f"Analyzing {len(emails)} emails with Groq AI in one request...")
+            ai_response = self._post_groq(groq_key, prompt, max_tokens=150 * len(emails), json_mode=True)
+            if ai_response is None:
+                return None
+            print(f"Groq AI raw batch response: {ai_response}")
+            
+            # JSON mode returns an object; tolerate a bare array with prose around it too
+            try:
+                answers = json.loads(ai_response)
+            except ValueError:
+                answers = json.loads(ai_response[ai_response.index('['):ai_response.rindex(']') + 1])
+            if isinstance(answers, dict):
+                answers = answers.get('answers')
+            if not isinstance(answers, list) or len(answers) != len(emails):
+                print(f"Groq batch response has the wrong shape, expected {len(emails)} answers")
+                return None
+            return answers
+            
+        except Exception as e:
+            print(f"Groq batch email analysis failed: {e}")
+            return None
+    
+    def _groq_cache_key(self, email_data: Dict[str, Any]) -> str:
+        """Hash of the parts of an email that Groq sees"""
+        content = f"{email_data['from']}\x1f{email_data['subject']}\x1f{email_data['body'][:1500]}"
+        return hashlib.blake2b(content.encode('utf-8', errors='ignore'), digest_size=16).hexdigest()
+    
+    def _cached_groq_result(self, email_data: Dict[str, Any]) -> Optional[str]:
+        """Return a still-fresh Groq verdict for this email, or None"""
+        key = self._groq_cache_key(email_data)
+        entry = self._groq_cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= GROQ_CACHE_TTL:
+            del self._groq_cache[key]
+            return None
+        self._groq_cache.move_to_end(key)
+        return entry[1]
+    
+    def _store_groq_result(self, email_data: Dict[str, Any], result: str):
+        """Remember a Groq verdict (a task or "NO_ACTION"), evicting the oldest past the cap"""
+        key = self._groq_cache_key(email_data)
+        self._groq_cache[key] = (time.monotonic(), result)
+        self._groq_cache.move_to_end(key)
+        if len(self._groq_cache) > GROQ_CACHE_SIZE:
+            self._groq_cache.popitem(last=False)
+    
     def analyze_email_with_groq(self, email_data: Dict[str, Any]) -> Optional[str]:
         """Use Groq AI to analyze email and extract actionable task"""
+        cached = self._cached_groq_result(email_data)
+        if cached is not None:
+            print("Using cached Groq AI analysis")
+            return cached
+        
         try:
             # Load Groq API key
             groq_key = self.load_groq_api_key()
@@ -772,47 +1220,69 @@ Examples that should return "NO_ACTION":
 
 Response:"""
             
-            url = "https://api.groq.com/openai/v1/chat/completions"
-            headers = {
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {groq_key}'
-            }
-            
-            data = {
-                "model": "llama-3.3-70b-versatile",
-                "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": 150,
-                "temperature": 0.1  # Low temperature for consistent results
-            }
-            
             print("Analyzing email with Groq AI...")
-            response = requests.post(url, headers=headers, json=data, timeout=20)
-            
-            if response.status_code == 200:
-                result = response.json()
-                ai_response = result['choices'][0]['message']['content'].strip()
-                print(f"Groq AI raw response: {ai_response}")
-                
-                # Check if AI determined no action is needed
-                if "NO_ACTION" in ai_response.upper():
-                    print("Groq AI determined no action needed")
-                    return "NO_ACTION"
-                
-                # Clean and validate the response
-                cleaned_task = ai_response.strip()
-                if len(cleaned_task) > 5 and len(cleaned_task) < 300:  # Reasonable task length
-                    return cleaned_task
-                else:
-                    print(f"Groq response too short/long: {len(cleaned_task)} chars")
-                    return None
-            else:
-                print(f"Groq API error: {response.status_code} - {response.text}")
+            ai_response = self._post_groq(groq_key, prompt, max_tokens=150)
+            if ai_response is None:
                 return None
+            print(f"Groq AI raw response: {ai_response}")
+            task = self._parse_groq_task(ai_response)
+            if task:
+                self._store_groq_result(email_data, task)
+            return task
                 
         except Exception as e:
             print(f"Groq email analysis failed: {e}")
             return None
     
+    def _post_groq(self, groq_key: str, prompt: str, max_tokens: int, json_mode: bool = False) -> Optional[str]:
+        """Send one chat completion request to Groq; return the reply text, or None on an API error"""
+        url = "https://api.groq.com/openai/v1/chat/completions"
+        headers = {'Authorization': f'Bearer {groq_key}'}
+        
+        data = {
+            "model": "llama-3.3-70b-versatile",
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": 0.1  # Low temperature for consistent results
+        }
+        if json_mode:
+            data["response_format"] = {"type": "json_object"}  # Reply is guaranteed to parse
+        
+        response = self._get_http().post(url, headers=headers, json=data, timeout=(3, 20))  # Fail fast if the host is unreachable
+        if response.status_code != 200:
+            print(f"Groq API error: {response.status_code} - {response.text}")
+            return None
+        return response.json()['choices'][0]['message']['content'].strip()
+    
+    def _parse_groq_task(self, ai_response: str) -> Optional[str]:
+        """Turn Groq's answer for one email into a task, "NO_ACTION", or None if unusable"""
+        # Check if AI determined no action is needed
+        if "NO_ACTION" in ai_response.upper():
+            print("Groq AI determined no action needed")
+            return "NO_ACTION"
+        
+        # Clean and validate the response
+        cleaned_task = ai_response.strip()
+        if len(cleaned_task) > 5 and len(cleaned_task) < 300:  # Reasonable task length
+            return cleaned_task
+        else:
+            print(f"Groq response too short/long: {len(cleaned_task)} chars")
+            return None
+    
+    def _get_http(self):
+        """Return the shared HTTP session, retrying rate-limited and transient Groq errors"""
+        if self._http is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            
+            retry = Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504],
+                          allowed_methods=frozenset({'POST'}), raise_on_status=False)
+            self._http = requests.Session()
+            self._http.headers.update({'Content-Type': 'application/json'})
+            self._http.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=retry))
+        return self._http
+    
     def load_groq_api_key(self) -> Optional[str]:
         """Load Groq API key from the main application directory"""
         try:
@@ -820,11 +1290,21 @@ Response:"""
             main_app_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
             key_file = os.path.join(main_app_dir, 'groq_api_key.txt')
             
-            if os.path.exists(key_file):
-                with open(key_file, 'r') as f:
-                    api_key = f.read().strip()
-                    if api_key and api_key != 'gsk-your-groq-api-key-here':
-                        return api_key
+            try:
+                mtime_ns = os.stat(key_file).st_mtime_ns
+            except FileNotFoundError:
+                mtime_ns = None
+            if mtime_ns is not None:
+                # Only re-read when the file changes, so a rotated key is picked up without a restart
+                cached = self._groq_key_file
+                if cached is not None and cached[0] == mtime_ns:
+                    api_key = cached[1]
+                else:
+                    with open(key_file, 'r') as f:
+                        api_key = f.read().strip()
+                    self._groq_key_file = (mtime_ns, api_key)
+                if api_key and api_key != 'gsk-your-groq-api-key-here':
+                    return api_key
         except Exception as e:
             print(f"Error reading Groq API key file: {e}")
         
@@ -833,17 +1313,14 @@ Response:"""
     
     def fallback_email_analysis(self, email_data: Dict[str, Any]) -> Optional[str]:
         """Simplified fallback analysis when Groq AI is unavailable"""
-        subject = email_data['subject'].lower()
         body = email_data['body'].lower()
         sender_name = self.extract_sender_name(email_data['from'])
         
-        # Simple keyword-based importance check
-        urgent_keywords = ['urgent', 'asap', 'deadline', 'due', 'important', 'critical']
-        action_keywords = ['please', 'can you', 'review', 'approve', 'complete', 'need you to']
-        
-        has_urgent = any(keyword in subject or keyword in body for keyword in urgent_keywords)
-        has_action = any(keyword in subject or keyword in body for keyword in action_keywords)
-        has_question = '?' in subject or '?' in body
+        # Simple keyword-based importance check, one scan per keyword group
+        combined = f"{email_data['subject']}\n{email_data['body']}"
+        has_urgent = _URGENT_KEYWORDS_RE.search(combined) is not None
+        has_action = _ACTION_KEYWORDS_RE.search(combined) is not None
+        has_question = '?' in combined
         
         if has_urgent or has_action or has_question:
             # Generate simple task
@@ -881,31 +1358,33 @@ Response:"""
             return goals
         
         try:
-            # Get recent emails
-            recent_emails = self.get_recent_emails(hours=4)  # Check last 4 hours
-            
-            # Analyze emails for importance
+            # Waits for a check still running from the previous session, if any
+            with self._io_lock:
+                # Get recent emails
+                recent_emails = self.get_recent_emails(hours=4)  # Check last 4 hours
+                
+                # Analyze emails for importance
+                tasks = self.analyze_email_importance_batch(recent_emails)
             important_email_tasks = []
-            for email_data in recent_emails:
+            for email_data, task in zip(recent_emails, tasks):
                 # Create unique identifier for this email
-                email_id = f"{email_data['from']}:{email_data['subject']}:{email_data.get('date', '')}"
+                email_id = self.email_id(email_data)
                 
                 # Mark this email as processed during initial analysis - THIS IS KEY
                 # All emails checked during initial analysis should be marked as processed
                 # regardless of whether they generated tasks or not
-                self.processed_emails.add(email_id)
-                print(f"DEBUG: Marking email as processed during initial analysis: {email_data['subject'][:50]}")
+                self.mark_email_processed(email_id)
+                logger.debug("Marking email as processed during initial analysis: %s", email_data['subject'][:50])
                 
-                task = self.analyze_email_importance(email_data)
                 if task and task != "NO_ACTION":
                     # Format task for inclusion in goals list
                     formatted_task = f"• Email: {task}"
                     important_email_tasks.append(formatted_task)
-                    print(f"DEBUG: Added email task to initial goals: {task}")
+                    logger.debug("Added email task to initial goals: %s", task)
                 else:
-                    print(f"DEBUG: Email not important or no action needed during initial analysis")
+                    logger.debug("Email not important or no action needed during initial analysis")
             
-            print(f"DEBUG: Total emails marked as processed during initial analysis: {len(self.processed_emails)}")
+            logger.debug("Total emails marked as processed during initial analysis: %s", len(self.processed_emails))
             
             # Return goals with email tasks appended for the plugin dialog to handle
             return goals + important_email_tasks
@@ -917,95 +1396,101 @@ Response:"""
     
     def on_session_start(self, session_data: Dict[str, Any]):
         """Hook called when session starts - begin email monitoring"""
-        print("DEBUG: Email plugin session_start hook called")
-        print(f"DEBUG: Email config available: {bool(self.email_config)}")
-        print(f"DEBUG: Email config details: {list(self.email_config.keys()) if self.email_config else 'None'}")
+        logger.debug("Email plugin session_start hook called")
+        logger.debug("Email config available: %s", bool(self.email_config))
+        logger.debug("Email config details: %s", list(self.email_config.keys()) if self.email_config else 'None')
         
         self.session_active = True
         
         # DON'T clear processed emails at session start - keep the ones from initial analysis
         # This prevents asking about the same emails again during the session
-        print(f"DEBUG: Keeping {len(self.processed_emails)} emails marked as processed from initial analysis")
+        logger.debug("Keeping %s emails marked as processed from initial analysis", len(self.processed_emails))
         
         # Start periodic email checking every 2 minutes during session
-        print("DEBUG: Starting email monitoring timer (2 minute intervals)")
+        logger.debug("Starting email monitoring timer (2 minute intervals)")
         self.email_timer.start(2 * 60 * 1000)  # 2 minutes in milliseconds
-        print(f"DEBUG: Email timer active: {self.email_timer.isActive()}")
-        print(f"DEBUG: Email timer interval: {self.email_timer.interval()}ms")
+        logger.debug("Email timer active: %s", self.email_timer.isActive())
+        logger.debug("Email timer interval: %sms", self.email_timer.interval())
+        self.health_timer.start(30 * 1000)  # 30 seconds
     
-    def on_session_update(self, elapsed_minutes: float, progress_percent: float):
-        """Hook called during session updates."""
+    def _health_check(self):
+        """Show email timer status every 30 seconds and restart it if it stopped"""
         from datetime import datetime
-        # Debug: Show email timer status every 30 seconds
-        if int(elapsed_minutes * 60) % 30 == 0:  # Every 30 seconds
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            print(f"DEBUG: [{timestamp}] Email timer status - Active: {self.email_timer.isActive()}, Session active: {self.session_active}, Has config: {bool(self.email_config)}")
-            print(f"DEBUG: [{timestamp}] Email timer interval: {self.email_timer.interval()}ms, Processed emails: {len(self.processed_emails)}")
-            
-            # If timer is not active but session is active, restart it
-            if self.session_active and self.email_config and not self.email_timer.isActive():
-                print(f"DEBUG: [{timestamp}] Email timer stopped unexpectedly! Restarting...")
-                self.email_timer.start(2 * 60 * 1000)  # 2 minutes
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        logger.debug("[%s] Email timer status - Active: %s, Session active: %s, Has config: %s", timestamp, self.email_timer.isActive(), self.session_active, bool(self.email_config))
+        logger.debug("[%s] Email timer interval: %sms, Processed emails: %s", timestamp, self.email_timer.interval(), len(self.processed_emails))
+        
+        # If timer is not active but session is active, restart it
+        if self.session_active and self.email_config and not self.email_timer.isActive():
+            logger.debug("[%s] Email timer stopped unexpectedly! Restarting...", timestamp)
+            self.email_timer.start(2 * 60 * 1000)  # 2 minutes
     
     def check_new_emails(self):
         """Check for new important emails during session"""
         from datetime import datetime
         timestamp = datetime.now().strftime("%H:%M:%S")
-        print(f"DEBUG: [{timestamp}] check_new_emails() called")
+        logger.debug("[%s] check_new_emails() called", timestamp)
         
         if not self.session_active or not self.email_config:
-            print(f"DEBUG: [{timestamp}] Email checking skipped - session_active: {self.session_active}, has_config: {bool(self.email_config)}")
+            logger.debug("[%s] Email checking skipped - session_active: %s, has_config: %s", timestamp, self.session_active, bool(self.email_config))
             return
         
-        try:
-            print(f"DEBUG: [{timestamp}] Checking for new emails...")
-            # Check for emails from the last 10 minutes to catch more emails
-            recent_emails = self.get_recent_emails(hours=0.17)  # 10 minutes (10/60 = 0.17)
-            print(f"DEBUG: [{timestamp}] Found {len(recent_emails)} recent emails")
-            print(f"DEBUG: [{timestamp}] Currently have {len(self.processed_emails)} processed emails")
+        # One check at a time; a slow server just delays the next tick's results
+        if self._email_worker is not None and self._email_worker.isRunning():
+            logger.debug("[%s] Previous email check still running, skipping", timestamp)
+            return
+        
+        logger.debug("[%s] Checking for new emails...", timestamp)
+        logger.debug("[%s] Currently have %s processed emails", timestamp, len(self.processed_emails))
+        # IMAP and analysis requests run off the GUI thread; dialogs are shown from
+        # _on_emails_ready back on the main thread
+        worker = EmailCheckWorker(self, frozenset(self.processed_emails))
+        worker.emails_ready.connect(self._on_emails_ready)
+        worker.error_occurred.connect(self._on_email_check_error)
+        worker.finished.connect(self._on_email_worker_finished)
+        self._email_worker = worker
+        worker.start()
+    
+    def _on_emails_ready(self, results):
+        """Record analyzed emails and notify about important ones (main thread)"""
+        if not self.session_active:
+            logger.debug("Session ended during email check, discarding results")
+            return
+        
+        for email_id, email_data, task in results:
+            # Mark as processed regardless of outcome
+            self.mark_email_processed(email_id)
+            logger.debug("Added email to processed list. Total processed: %s", len(self.processed_emails))
             
-            new_emails_found = 0
-            for email_data in recent_emails:
-                # Create unique identifier for this email
-                email_id = f"{email_data['from']}:{email_data['subject']}:{email_data.get('date', '')}"
-                
-                # Skip if we've already processed this email
-                if email_id in self.processed_emails:
-                    print(f"DEBUG: Skipping already processed email: {email_data['subject'][:50]}")
-                    continue
-                
-                new_emails_found += 1
-                print(f"DEBUG: Analyzing new email #{new_emails_found}: {email_data['subject'][:50]}")
-                print(f"DEBUG: From: {email_data['from']}")
-                task = self.analyze_email_importance(email_data)
+            if task and task != "NO_ACTION":
+                logger.debug("Important email found - showing notification dialog")
+                logger.debug("Task: %s", task)
                 
-                # Mark as processed regardless of outcome
-                self.processed_emails.add(email_id)
-                print(f"DEBUG: Added email to processed list. Total processed: {len(self.processed_emails)}")
+                # Show email notification dialog
+                self.show_email_notification_dialog(task, email_data)
                 
-                if task and task != "NO_ACTION":
-                    print(f"DEBUG: Important email found - showing notification dialog")
-                    print(f"DEBUG: Task: {task}")
-                    
-                    # Show email notification dialog
-                    self.show_email_notification_dialog(task, email_data)
-                    
-                    # Also print to console for debugging
-                    print(f"NOTIFICATION: Important Email - {task}")
-                else:
-                    print(f"DEBUG: Email not important or no action needed (task: {task})")
-            
-            print(f"DEBUG: Email check complete. Found {new_emails_found} new emails to analyze.")
+                # Also print to console for debugging
+                print(f"NOTIFICATION: Important Email - {task}")
+            else:
+                logger.debug("Email not important or no action needed (task: %s)", task)
         
-        except Exception as e:
-            print(f"Error checking new emails: {e}")
-            import traceback
-            traceback.print_exc()
-            
-            # Make sure the timer keeps running even if there's an error
-            if self.session_active and self.email_config and not self.email_timer.isActive():
-                print(f"DEBUG: Restarting email timer after error")
-                self.email_timer.start(2 * 60 * 1000)
+        logger.debug("Email check complete. Found %s new emails to analyze.", len(results))
+    
+    def _on_email_check_error(self, error):
+        """Report a failed background email check (main thread)"""
+        print(f"Error checking new emails: {error}")
+        
+        # Make sure the timer keeps running even if there's an error
+        if self.session_active and self.email_config and not self.email_timer.isActive():
+            logger.debug("Restarting email timer after error")
+            self.email_timer.start(2 * 60 * 1000)
+    
+    def _on_email_worker_finished(self):
+        """Drop the finished worker; close connections if the session ended while it ran"""
+        self._email_worker = None
+        if not self.session_active:
+            self._close_imap()
+            self._close_http()
     
     def show_email_notification_dialog(self, task: str, email_data: Dict[str, Any]):
         """Show email notification dialog and potentially add to checklist"""
@@ -1024,7 +1509,7 @@ Response:"""
             dialog.raise_()
             dialog.activateWindow()
             
-            print(f"DEBUG: Email notification dialog shown for task: {task}")
+            logger.debug("Email notification dialog shown for task: %s", task)
             
         except Exception as e:
             print(f"Error showing email notification dialog: {e}")
@@ -1036,40 +1521,20 @@ Response:"""
         try:
             if dialog.add_to_checklist and self._progress_popup:
                 # Add the task to the current checklist
-                print(f"DEBUG: Adding email task to checklist: {task}")
+                logger.debug("Adding email task to checklist: %s", task)
                 
                 # Get current goals and add the email task
                 email_task = f"Email: {task}"
                 
                 # Add to the goals list and update the UI
                 self._progress_popup.goals.append(email_task)
+                if hasattr(self._progress_popup, '_checklist_version'):
+                    # Invalidate plugins' cached checklist reads, as add_checklist_item does
+                    self._progress_popup._checklist_version += 1
                 
                 # Create a new checkbox for the task
-                from PyQt5.QtWidgets import QCheckBox
                 checkbox = QCheckBox(email_task)
-                checkbox.setStyleSheet("""
-                    QCheckBox {
-                        font-size: 14px;
-                        color: #4a4a4a;
-                        spacing: 12px;
-                        padding: 8px 0px;
-                        font-weight: 500;
-                        line-height: 1.4;
-                        margin-bottom: 2px;
-                    }
-                    QCheckBox::indicator {
-                        width: 18px;
-                        height: 18px;
-                        border-radius: 9px;
-                        border: 2px solid #d1d1d6;
-                        background-color: white;
-                    }
-                    QCheckBox::indicator:checked {
-                        background-color: #007aff;
-                        border-color: #007aff;
-                        image: url(data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMTIiIGhlaWdodD0iMTIiIHZpZXdCb3g9IjAgMCAxMiAxMiIgZmlsbD0ibm9uZSIgeG1sbnM9Imh0dHA6Ly93d3cudzMub3JnLzIwMDAvc3ZnIj4KPHBhdGggZD0iTTEwIDNMNC41IDguNUwyIDYiIHN0cm9rZT0id2hpdGUiIHN0cm9rZS13aWR0aD0iMiIgc3Ryb2tlLWxpbmVjYXA9InJvdW5kIiBzdHJva2UtbGluZWpvaW49InJvdW5kIi8+Cjwvc3ZnPgo=);
-                    }
-                """)
+                checkbox.setStyleSheet(EMAIL_TASK_CHECKBOX_STYLE)
                 checkbox.stateChanged.connect(self._progress_popup.goal_checked)
                 
                 # Add to the goals scroll layout
@@ -1080,7 +1545,7 @@ Response:"""
                         goals_widget.layout().insertWidget(-1, checkbox)  # Insert before stretch
                         self._progress_popup.goal_checkboxes.append(checkbox)
                 
-                print(f"DEBUG: Email task added to checklist successfully")
+                logger.debug("Email task added to checklist successfully")
                 
             # Clean up the dialog reference
             self.current_email_dialog = None
@@ -1097,36 +1562,48 @@ Response:"""
         """Show macOS system notification"""
         try:
             import subprocess
-            script = f'''
-            display notification "{message}" with title "{title}" sound name "default"
+            # Title and message go in as arguments, so quotes in them can't break the script;
+            # Popen returns without waiting for osascript to start up
+            script = '''
+            on run argv
+                display notification (item 2 of argv) with title (item 1 of argv) sound name "default"
+            end run
             '''
-            subprocess.run(['osascript', '-e', script], check=True)
+            subprocess.Popen(['osascript', '-e', script, title, message],
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         except Exception as e:
             print(f"Error showing notification: {e}")
     
     def on_session_end(self, session_data: Dict[str, Any]):
         """Hook called when session ends"""
-        print("DEBUG: Email plugin session_end hook called")
-        print(f"DEBUG: Session was active: {self.session_active}")
-        print(f"DEBUG: Email timer was active: {self.email_timer.isActive()}")
+        logger.debug("Email plugin session_end hook called")
+        logger.debug("Session was active: %s", self.session_active)
+        logger.debug("Email timer was active: %s", self.email_timer.isActive())
         
         self.session_active = False
         self.email_timer.stop()
+        self.health_timer.stop()
+        if self._email_worker is None:  # Otherwise closed when the worker finishes
+            self._close_imap()
         
         # Close any open email notification dialogs to ensure session summary takes priority
         if self.current_email_dialog:
-            print("DEBUG: Closing email notification dialog for session end")
+            logger.debug("Closing email notification dialog for session end")
             try:
                 self.current_email_dialog.close()
                 self.current_email_dialog = None
             except Exception as e:
-                print(f"DEBUG: Error closing email dialog: {e}")
+                logger.debug("Error closing email dialog: %s", e)
         
-        print("DEBUG: Email monitoring stopped")
-        print(f"DEBUG: Total emails processed during session: {len(self.processed_emails)}")
+        logger.debug("Email monitoring stopped")
+        logger.debug("Total emails processed during session: %s", len(self.processed_emails))
     
     def cleanup(self):
         """Cleanup when plugin is disabled"""
         self.session_active = False
         if self.email_timer.isActive():
-            self.email_timer.stop()
\ No newline at end of file
+            self.email_timer.stop()
+        self.health_timer.stop()
+        if self._email_worker is None:  # Otherwise closed when the worker finishes
+            self._close_imap()
+            self._close_http()
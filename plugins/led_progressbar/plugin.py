@@ -1,5 +1,9 @@
-import sys
+import logging
 import os
+import queue
+import re
+import threading
+import time
 from abc import ABC, abstractmethod
 from typing import Dict, List, Any
 from PyQt5.QtCore import Qt
@@ -7,33 +11,61 @@ from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QDialog
 import serial
 import serial.tools.list_ports
 
-# Add parent directories to path to import plugin_system
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from plugin_system import PluginBase
 
+# DEBUG lines are only formatted and written when FOCUS_DEBUG is set
+logger = logging.getLogger(__name__)
+if os.environ.get('FOCUS_DEBUG'):
+    logging.basicConfig(format='DEBUG: %(message)s')
+    logger.setLevel(logging.DEBUG)
+
+# Known identifiers for ESP boards, matched against port description and device
+ESP_PORT_PATTERN = re.compile(r'USB|wch|ESP|usbserial', re.IGNORECASE)
+
 def find_esp8266():
     """Find ESP8266 device port"""
-    ports = serial.tools.list_ports.comports()
-    for port in ports:
-        # Match by known identifiers for ESP boards
-        if ('USB' in port.description or 'wch' in port.description.lower() 
-            or 'ESP' in port.description or 'usbserial' in port.device):
+    search = ESP_PORT_PATTERN.search
+    for port in serial.tools.list_ports.comports():
+        if search(port.description) or search(port.device):
             return port.device
     return None
 
-def connect_to_esp():
-    """Attempt to connect to ESP8266, return serial object or None"""
-    port = find_esp8266()
-    if not port:
-        return None
-        
+# Port scans are slow, so after a failed attempt the next waits 5 s, doubling up to 60 s;
+# the last port that worked is tried before scanning again
+ESP_RETRY_MIN = 5.0
+ESP_RETRY_MAX = 60.0
+_scan_state = {'next_try': 0.0, 'backoff': ESP_RETRY_MIN, 'port': None}
+
+def open_esp(port, report_errors=True):
+    """Open the ESP8266 serial port, return serial object or None"""
     try:
         ser = serial.Serial(port, 115200, timeout=1)
         print(f"Connected to ESP8266 at {port}")
         return ser
     except Exception as e:
-        print(f"Failed to connect to {port}: {e}")
+        if report_errors:
+            print(f"Failed to connect to {port}: {e}")
+        return None
+
+def connect_to_esp():
+    """Attempt to connect to ESP8266, return serial object or None"""
+    now = time.monotonic()
+    if now < _scan_state['next_try']:
         return None
+    
+    last_port = _scan_state['port']
+    ser = open_esp(last_port, report_errors=False) if last_port else None
+    if ser is None:
+        port = find_esp8266()
+        ser = open_esp(port) if port else None
+        if ser is None:
+            _scan_state['next_try'] = now + _scan_state['backoff']
+            _scan_state['backoff'] = min(_scan_state['backoff'] * 2, ESP_RETRY_MAX)
+            return None
+        _scan_state['port'] = port
+    
+    _scan_state['backoff'] = ESP_RETRY_MIN
+    return ser
 
 def is_esp_connected(ser):
     """Check if ESP connection is still valid"""
@@ -46,70 +78,132 @@ def is_esp_connected(ser):
 
 ser = None  # Global serial object
 
+PROGRESS_PREFIX = b"progress:"
+
 class Plugin(PluginBase):
     def __init__(self):
         super().__init__()
         self.name = "LED Progressbar"
         self.version = "1.0.0"
         self.description = "Support for LED Progressbar (ESP 8266 Version)"
+        # Commands for the writer thread, so serial writes never block the UI; None stops it
+        self._tx_q = queue.Queue(maxsize=8)
+        self._tx_thread = None
+        # Last progress value queued, and items already celebrated, so repeats send nothing
+        self._last_progress_sent = -1
+        self._checked_items = set()
 
     def initialize(self) -> bool:
         global ser
+        _scan_state['next_try'] = 0.0  # Enabling the plugin always tries right away
         ser = connect_to_esp()
+        self._tx_thread = threading.Thread(target=self._tx_loop, name="led-progressbar-tx", daemon=True)
+        self._tx_thread.start()
         print("LED Progressbar Plugin Initialized")
         if is_esp_connected(ser):
-            ser.write(b"progress:0\n")
+            self._send(b"progress:0\n")
         return True
 
     def cleanup(self):
         global ser
         if is_esp_connected(ser):
-            ser.write(b"progress:0\n")
+            self._send(b"progress:0\n")
+        if self._tx_thread is not None:
+            self._send(None)
+            self._tx_thread.join(timeout=2)
+            self._tx_thread = None
+        if is_esp_connected(ser):
             ser.close()
 
+    def _send(self, command):
+        """Queue a command for the ESP, dropping the oldest one if the writer has fallen behind"""
+        try:
+            self._tx_q.put_nowait(command)
+        except queue.Full:
+            try:
+                self._tx_q.get_nowait()
+            except queue.Empty:
+                pass
+            self._tx_q.put_nowait(command)
+
+    def _tx_loop(self):
+        """Write queued commands to the ESP; of consecutive progress updates only the newest is sent"""
+        held = []
+        while True:
+            command = held.pop() if held else self._tx_q.get()
+            if command is None:
+                return
+            if command.startswith(PROGRESS_PREFIX):
+                while True:
+                    try:
+                        following = self._tx_q.get_nowait()
+                    except queue.Empty:
+                        break
+                    if following is None or not following.startswith(PROGRESS_PREFIX):
+                        held.append(following)
+                        break
+                    command = following
+            if is_esp_connected(ser):
+                try:
+                    ser.write(command)
+                    ser.flush()
+                except Exception as e:
+                    print(f"Failed to write to ESP: {e}")
+
     def on_checklist_item_changed(self, item_text: str, is_checked: bool):
         global ser
-        print(f"DEBUG: LED plugin checklist hook called - item: '{item_text}', checked: {is_checked}")
+        logger.debug("LED plugin checklist hook called - item: '%s', checked: %s", item_text, is_checked)
+        if not is_checked:
+            self._checked_items.discard(item_text)
+        elif item_text in self._checked_items:
+            logger.debug("Item already checked, not sending command again")
+            return
         if is_checked and is_esp_connected(ser):
-            print("DEBUG: Sending boxchecked command to ESP")
-            ser.write(b"boxchecked\n")  # Add newline character
-            ser.flush()  # Ensure data is sent immediately
+            self._checked_items.add(item_text)
+            logger.debug("Sending boxchecked command to ESP")
+            self._send(b"boxchecked\n")  # Add newline character
         else:
             if not is_checked:
-                print("DEBUG: Item was unchecked, not sending command")
+                logger.debug("Item was unchecked, not sending command")
             if not is_esp_connected(ser):
-                print("DEBUG: ESP not connected, cannot send command")
+                logger.debug("ESP not connected, cannot send command")
 
     def on_session_update(self, elapsed_minutes: float, progress_percent: float):
         global ser
-        print(f"DEBUG: Session update - progress: {progress_percent}%, ESP connected: {is_esp_connected(ser)}")
+        progress = int(progress_percent)
+        if progress == self._last_progress_sent and is_esp_connected(ser):
+            return
+        if logger.isEnabledFor(logging.DEBUG):  # Called every tick; skip the connection probe
+            logger.debug("Session update - progress: %s%%, ESP connected: %s", progress_percent, is_esp_connected(ser))
         
         # Try to reconnect if not connected
         if not is_esp_connected(ser):
-            print("DEBUG: ESP not connected, attempting reconnection...")
+            logger.debug("ESP not connected, attempting reconnection...")
             ser = connect_to_esp()
+            self._last_progress_sent = -1
         
         if is_esp_connected(ser):
-            command = f"progress:{int(progress_percent)}\n".encode()  # Add newline
-            print(f"DEBUG: Sending command: {command}")
-            ser.write(command)
-            ser.flush()
+            command = f"progress:{progress}\n".encode()  # Add newline
+            logger.debug("Sending command: %s", command)
+            self._send(command)
+            self._last_progress_sent = progress
         else:
-            print("DEBUG: Could not establish ESP connection for progress update")
+            logger.debug("Could not establish ESP connection for progress update")
     
     def on_session_end(self, session_data: Dict[str, Any]):
         """Turn off LEDs when session ends"""
         global ser
-        print("DEBUG: Session ended, turning off LEDs")
+        logger.debug("Session ended, turning off LEDs")
+        self._last_progress_sent = -1
+        self._checked_items.clear()
         
         # Try to reconnect if not connected
         if not is_esp_connected(ser):
-            print("DEBUG: ESP not connected, attempting reconnection for cleanup...")
+            logger.debug("ESP not connected, attempting reconnection for cleanup...")
             ser = connect_to_esp()
         
         if is_esp_connected(ser):
-            print("DEBUG: Sending progress:0 to turn off LEDs")
-            ser.write(b"progress:0\n")
-            ser.flush()
+            logger.debug("Sending progress:0 to turn off LEDs")
+            self._send(b"progress:0\n")
         else:
-            print("DEBUG: Could not establish ESP connection for cleanup")
+            logger.debug("Could not establish ESP connection for cleanup")
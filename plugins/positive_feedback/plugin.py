@@ -17,8 +17,6 @@ affirmations = [
     "Your hard work is paying off!"
 ]
 
-previous_completion = 0
-
 class Plugin(PluginBase):
     
     def __init__(self):
@@ -26,6 +24,9 @@ class Plugin(PluginBase):
         self.name = "Positive Feedback"
         self.version = "1.0.0"
         self.description = "Gives small positive notifications as goal progress is made."
+        self._dialog = None  # Built on first use and reused for every notification
+        self._label = None
+        self._previous_completion = 0  # Highest progress already congratulated
 
     def initialize(self) -> bool:
         print("Positive Feedback plugin initialized!")
@@ -33,31 +34,42 @@ class Plugin(PluginBase):
 
 
     def cleanup(self):
-        pass
+        if self._dialog is not None:
+            self._dialog.close()
+            self._dialog = None
+            self._label = None
 
+    def on_session_end(self, session_data: Dict[str, Any]):
+        """Close the stay-on-top feedback dialog so it doesn't cover the session summary"""
+        if self._dialog is not None:
+            self._dialog.close()
 
-    def on_checklist_item_changed(self, item_text: str, is_checked: bool):
-        global previous_completion
-        progress_percent = self.get_checklist_progress_percentage()
-        if progress_percent > previous_completion and progress_percent is not 0:
-            # Show positive feedback pos_dialog
+    def _get_dialog(self):
+        """Return the feedback dialog, building it the first time"""
+        if self._dialog is None:
             pos_dialog = QDialog()
             pos_dialog.setWindowTitle("Positive Feedback")
             pos_dialog.setWindowFlags(Qt.Window | Qt.WindowStaysOnTopHint)
             pos_dialog.setFixedSize(300, 150)
             layout = QVBoxLayout()
-            label = QLabel(f"{affirmations[int(progress_percent / 10)]} You've now completed {int(progress_percent)}% of your session!")
-            layout.addWidget(label)
+            self._label = QLabel()
+            layout.addWidget(self._label)
             button = QPushButton("OK")
             button.clicked.connect(pos_dialog.accept)
             layout.addWidget(button)
             pos_dialog.setLayout(layout)
+            self._dialog = pos_dialog
+        return self._dialog
+
+
+    def on_checklist_item_changed(self, item_text: str, is_checked: bool):
+        progress_percent = self.get_checklist_progress_percentage()
+        if progress_percent > self._previous_completion and progress_percent != 0:
+            # Show positive feedback pos_dialog, clamping 100% to the last affirmation
+            idx = min(int(progress_percent // 10), len(affirmations) - 1)
+            pos_dialog = self._get_dialog()
+            self._label.setText(f"{affirmations[idx]} You've now completed {int(progress_percent)}% of your session!")
             pos_dialog.show()
-            # Keep a reference to prevent garbage collection
-            if not hasattr(self, '_active_dialogs'):
-                self._active_dialogs = []
-            self._active_dialogs.append(pos_dialog)
-            # Remove from list when closed
-            pos_dialog.finished.connect(lambda: self._active_dialogs.remove(pos_dialog) if pos_dialog in self._active_dialogs else None)
+            pos_dialog.raise_()
             #update previous completion percentage
-            previous_completion = progress_percent
\ No newline at end of file
+            self._previous_completion = progress_percent
\ No newline at end of file